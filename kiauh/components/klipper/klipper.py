@@ -9,6 +9,7 @@
 from __future__ import annotations
 
 from dataclasses import dataclass, field
+from functools import cached_property
 from pathlib import Path
 from subprocess import CalledProcessError
 
@@ -26,7 +27,7 @@ from components.klipper import (
 from core.constants import CURRENT_USER
 from core.instance_manager.base_instance import BaseInstance
 from core.logger import Logger
-from utils.fs_utils import create_folders, get_data_dir
+from utils.fs_utils import create_folders
 from utils.sys_utils import get_service_file_path
 
 
@@ -35,26 +36,39 @@ from utils.sys_utils import get_service_file_path
 class Klipper:
     suffix: str
     base: BaseInstance = field(init=False, repr=False)
-    service_file_path: Path = field(init=False)
     log_file_name: str = KLIPPER_LOG_NAME
     klipper_dir: Path = KLIPPER_DIR
     env_dir: Path = KLIPPER_ENV_DIR
-    data_dir: Path = field(init=False)
-    cfg_file: Path = field(init=False)
-    env_file: Path = field(init=False)
-    serial: Path = field(init=False)
-    uds: Path = field(init=False)
 
     def __post_init__(self):
         self.base: BaseInstance = BaseInstance(Klipper, self.suffix)
         self.base.log_file_name = self.log_file_name
 
-        self.service_file_path: Path = get_service_file_path(Klipper, self.suffix)
-        self.data_dir: Path = get_data_dir(Klipper, self.suffix)
-        self.cfg_file: Path = self.base.cfg_dir.joinpath(KLIPPER_CFG_NAME)
-        self.env_file: Path = self.base.sysd_dir.joinpath(KLIPPER_ENV_FILE_NAME)
-        self.serial: Path = self.base.comms_dir.joinpath(KLIPPER_SERIAL_NAME)
-        self.uds: Path = self.base.comms_dir.joinpath(KLIPPER_UDS_NAME)
+    # the paths depend on the data dir, which is only read when first needed
+
+    @cached_property
+    def service_file_path(self) -> Path:
+        return get_service_file_path(Klipper, self.suffix)
+
+    @cached_property
+    def data_dir(self) -> Path:
+        return self.base.data_dir
+
+    @cached_property
+    def cfg_file(self) -> Path:
+        return self.base.cfg_dir.joinpath(KLIPPER_CFG_NAME)
+
+    @cached_property
+    def env_file(self) -> Path:
+        return self.base.sysd_dir.joinpath(KLIPPER_ENV_FILE_NAME)
+
+    @cached_property
+    def serial(self) -> Path:
+        return self.base.comms_dir.joinpath(KLIPPER_SERIAL_NAME)
+
+    @cached_property
+    def uds(self) -> Path:
+        return self.base.comms_dir.joinpath(KLIPPER_UDS_NAME)
 
     def create(self) -> None:
         from utils.sys_utils import create_env_file, create_service_file
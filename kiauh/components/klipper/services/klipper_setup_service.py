@@ -53,6 +53,7 @@ from utils.sys_utils import (
     create_python_venv,
     install_python_requirements,
     unit_file_exists,
+    update_python_venv,
 )
 
 
@@ -166,7 +167,10 @@ class KlipperSetupService:
         InstanceManager.stop_all(self.klipper_list)
         git_pull_wrapper(KLIPPER_DIR)
         install_klipper_packages()
-        install_python_requirements(KLIPPER_ENV_DIR, KLIPPER_REQ_FILE)
+        if not update_python_venv(
+            KLIPPER_ENV_DIR, KLIPPER_REQ_FILE, self.settings.klipper.use_python_binary
+        ):
+            install_python_requirements(KLIPPER_ENV_DIR, KLIPPER_REQ_FILE)
         InstanceManager.start_all(self.klipper_list)
 
     def remove(
@@ -244,23 +248,27 @@ class KlipperSetupService:
         if not self.klipper_list:
             self.__install_deps()
 
-        for i in name_dict:
-            # skip this iteration if there is already an instance with the name
-            if name_dict[i] in [n.suffix for n in self.klipper_list]:
-                continue
+        # skip the names of already existing instances
+        existing = [n.suffix for n in self.klipper_list]
+        new_instances = [
+            Klipper(suffix=suffix)
+            for suffix in name_dict.values()
+            if suffix not in existing
+        ]
 
-            instance = Klipper(suffix=name_dict[i])
-            instance.create()
-            InstanceManager.enable(instance)
+        # if a client-config is installed, include it in the new example cfg
+        clients = get_existing_clients() if create_example_cfg else []
 
+        # create the files of all instances first, then let systemd enable and
+        # start all of them at once, it runs the jobs of all units in parallel
+        for instance in new_instances:
+            instance.create()
             if create_example_cfg:
-                # if a client-config is installed, include it in the new example cfg
-                clients = get_existing_clients()
                 create_example_printer_cfg(instance, clients)
 
-            InstanceManager.start(instance)
-
         cmd_sysctl_manage("daemon-reload")
+        InstanceManager.enable_all(new_instances)
+        InstanceManager.start_all(new_instances)
 
         # step 4: check/handle conflicting packages/services
         handle_disruptive_system_packages()
@@ -9,6 +9,7 @@
 from __future__ import annotations
 
 from dataclasses import dataclass, field
+from functools import cached_property
 from pathlib import Path
 from subprocess import CalledProcessError
 
@@ -37,30 +38,47 @@ from utils.sys_utils import get_service_file_path
 class Moonraker:
     suffix: str
     base: BaseInstance = field(init=False, repr=False)
-    service_file_path: Path = field(init=False)
     log_file_name: str = MOONRAKER_LOG_NAME
     moonraker_dir: Path = MOONRAKER_DIR
     env_dir: Path = MOONRAKER_ENV_DIR
-    data_dir: Path = field(init=False)
-    cfg_file: Path = field(init=False)
-    env_file: Path = field(init=False)
-    backup_dir: Path = field(init=False)
-    certs_dir: Path = field(init=False)
-    db_dir: Path = field(init=False)
-    port: int | None = field(init=False)
 
     def __post_init__(self):
         self.base: BaseInstance = BaseInstance(Klipper, self.suffix)
         self.base.log_file_name = self.log_file_name
 
-        self.service_file_path: Path = get_service_file_path(Moonraker, self.suffix)
-        self.data_dir: Path = self.base.data_dir
-        self.cfg_file: Path = self.base.cfg_dir.joinpath(MOONRAKER_CFG_NAME)
-        self.env_file: Path = self.base.sysd_dir.joinpath(MOONRAKER_ENV_FILE_NAME)
-        self.backup_dir: Path = self.base.data_dir.joinpath("backup")
-        self.certs_dir: Path = self.base.data_dir.joinpath("certs")
-        self.db_dir: Path = self.base.data_dir.joinpath("database")
-        self.port: int | None = self._get_port()
+    # the paths depend on the data dir, which is only read when first needed
+
+    @cached_property
+    def service_file_path(self) -> Path:
+        return get_service_file_path(Moonraker, self.suffix)
+
+    @cached_property
+    def data_dir(self) -> Path:
+        return self.base.data_dir
+
+    @cached_property
+    def cfg_file(self) -> Path:
+        return self.base.cfg_dir.joinpath(MOONRAKER_CFG_NAME)
+
+    @cached_property
+    def env_file(self) -> Path:
+        return self.base.sysd_dir.joinpath(MOONRAKER_ENV_FILE_NAME)
+
+    @cached_property
+    def backup_dir(self) -> Path:
+        return self.base.data_dir.joinpath("backup")
+
+    @cached_property
+    def certs_dir(self) -> Path:
+        return self.base.data_dir.joinpath("certs")
+
+    @cached_property
+    def db_dir(self) -> Path:
+        return self.base.data_dir.joinpath("database")
+
+    @cached_property
+    def port(self) -> int | None:
+        return self._get_port()
 
     def create(self) -> None:
         from utils.sys_utils import create_env_file, create_service_file
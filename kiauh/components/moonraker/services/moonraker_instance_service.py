@@ -11,12 +11,14 @@ from __future__ import annotations
 from typing import Dict, List
 
 from components.moonraker.moonraker import Moonraker
+from core.instance_manager.instance_registry import InstanceRegistry
 from utils.instance_utils import get_instances
 
 
 class MoonrakerInstanceService:
     __cls_instance = None
     __instances: List[Moonraker] = []
+    __generation: int | None = None
 
     def __new__(cls) -> "MoonrakerInstanceService":
         if cls.__cls_instance is None:
@@ -31,11 +33,18 @@ class MoonrakerInstanceService:
         self.__initialized = True
 
     def load_instances(self) -> None:
+        # the instances only change if unit files were added or removed
+        generation = InstanceRegistry().generation
+        if generation == self.__generation:
+            return
         self.__instances = get_instances(Moonraker)
+        self.__generation = generation
 
     def create_new_instance(self, suffix: str) -> Moonraker:
         instance = Moonraker(suffix)
         self.__instances.append(instance)
+        # reload on the next call, even if creating the unit file fails
+        self.__generation = None
         return instance
 
     def get_all_instances(self) -> List[Moonraker]:
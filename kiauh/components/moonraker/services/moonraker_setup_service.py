@@ -58,11 +58,11 @@ from utils.input_utils import (
 from utils.sys_utils import (
     check_python_version,
     cmd_sysctl_manage,
-    cmd_sysctl_service,
     create_python_venv,
     get_ipv4_addr,
     install_python_requirements,
     unit_file_exists,
+    update_python_venv,
 )
 
 
@@ -183,7 +183,12 @@ class MoonrakerSetupService:
         InstanceManager.stop_all(self.moonraker_list)
         git_pull_wrapper(MOONRAKER_DIR)
         install_moonraker_packages()
-        install_python_requirements(MOONRAKER_ENV_DIR, MOONRAKER_REQ_FILE)
+        if not update_python_venv(
+            MOONRAKER_ENV_DIR,
+            MOONRAKER_REQ_FILE,
+            self.settings.moonraker.use_python_binary,
+        ):
+            install_python_requirements(MOONRAKER_ENV_DIR, MOONRAKER_REQ_FILE)
         InstanceManager.start_all(self.moonraker_list)
 
     def remove(
@@ -253,19 +258,20 @@ class MoonrakerSetupService:
         self.__install_deps()
 
         ports_map = self.misvc.get_instance_port_map()
+        # if a webclient and/or it's config is installed, patch
+        # its update section to the config
+        clients = get_existing_clients() if create_example_cfg else []
+
+        # create the files of all instances first, then let systemd enable and
+        # start all of them at once, it runs the jobs of all units in parallel
         for i in new_instances:
             i.create()
-            cmd_sysctl_service(i.service_file_path.name, "enable")
-
             if create_example_cfg:
-                # if a webclient and/or it's config is installed, patch
-                # its update section to the config
-                clients = get_existing_clients()
                 create_example_moonraker_conf(i, ports_map, clients)
 
-            cmd_sysctl_service(i.service_file_path.name, "start")
-
         cmd_sysctl_manage("daemon-reload")
+        InstanceManager.enable_all(new_instances)
+        InstanceManager.start_all(new_instances)
 
         # if mainsail is installed, and we installed
         # multiple moonraker instances, we enable mainsails remote mode
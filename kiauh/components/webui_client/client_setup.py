@@ -33,6 +33,7 @@ from components.webui_client.client_utils import (
     detect_client_cfg_conflict,
     enable_mainsail_remotemode,
     get_client_port_selection,
+    get_pinned_download,
     symlink_webui_nginx_log,
 )
 from core.instance_manager.instance_manager import InstanceManager
@@ -42,11 +43,13 @@ from core.settings.kiauh_settings import KiauhSettings
 from core.types.color import Color
 from utils.common import check_install_dependencies
 from utils.config_utils import add_config_section
-from utils.fs_utils import unzip
+from utils.fs_utils import replace_directory, unzip
+from utils.http_utils import DownloadError
 from utils.input_utils import get_confirm
 from utils.instance_utils import get_instances
 from utils.sys_utils import (
     cmd_sysctl_service,
+    download_and_unzip,
     download_file,
     get_ipv4_addr,
 )
@@ -152,25 +155,50 @@ def install_client(
 
 
 def download_client(client: BaseWebClient) -> None:
-    zipfile = f"{client.name.lower()}.zip"
-    target = Path().home().joinpath(zipfile)
+    staging_dir = client.client_dir.with_name(f".{client.client_dir.name}.staging")
     try:
-        Logger.print_status(
-            f"Downloading {client.display_name} from {client.download_url} ..."
-        )
-        download_file(client.download_url, target, True)
+        url, sha256 = get_pinned_download(client)
+        Logger.print_status(f"Downloading {client.display_name} from {url} ...")
+        if sha256 is None:
+            Logger.print_info("No checksum published, skipping verification ...")
+
+        if staging_dir.exists():
+            shutil.rmtree(staging_dir)
+
+        try:
+            download_and_unzip(url, staging_dir, True, sha256)
+        except DownloadError:
+            raise
+        except Exception as e:
+            Logger.print_warn(f"Streaming download failed: {e}")
+            Logger.print_info("Retrying with a resumable download ...")
+            if staging_dir.exists():
+                shutil.rmtree(staging_dir)
+            _download_and_unzip_file(client, url, staging_dir, sha256)
         Logger.print_ok("Download complete!")
 
-        Logger.print_status(f"Extracting {zipfile} ...")
-        unzip(target, client.client_dir)
-        target.unlink(missing_ok=True)
+        replace_directory(staging_dir, client.client_dir)
         Logger.print_ok("OK!")
 
     except Exception:
         Logger.print_error(f"Downloading {client.display_name} failed!")
+        if staging_dir.exists():
+            shutil.rmtree(staging_dir, ignore_errors=True)
         raise
 
 
+def _download_and_unzip_file(
+    client: BaseWebClient, url: str, target_dir: Path, sha256: str | None
+) -> None:
+    zipfile = f"{client.name.lower()}.zip"
+    target = Path().home().joinpath(zipfile)
+    download_file(url, target, True, sha256)
+
+    Logger.print_status(f"Extracting {zipfile} ...")
+    unzip(target, target_dir)
+    target.unlink(missing_ok=True)
+
+
 def update_client(client: BaseWebClient) -> None:
     Logger.print_status(f"Updating {client.display_name} ...")
     if not client.client_dir.exists():
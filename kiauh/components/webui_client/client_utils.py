@@ -14,7 +14,7 @@ import shutil
 from json import JSONDecodeError
 from pathlib import Path
 from subprocess import PIPE, CalledProcessError, run
-from typing import List, get_args
+from typing import List, Tuple, get_args
 
 from components.klipper.klipper import Klipper
 from components.webui_client import MODULE_PATH
@@ -43,6 +43,7 @@ from utils.fs_utils import create_symlink, remove_file
 from utils.git_utils import (
     get_latest_remote_tag,
     get_latest_unstable_tag,
+    get_release_asset_sha256,
 )
 from utils.input_utils import get_number_input
 from utils.instance_utils import get_instances
@@ -192,15 +193,23 @@ def get_remote_client_version(client: BaseWebClient) -> str | None:
         return None
 
 
-def backup_client_data(client: BaseWebClient) -> None:
+def get_client_backup_dir_name(client: BaseWebClient) -> str:
+    """
+    Get the name of the directory the backups of a client are stored in |
+    :param client: the client
+    :return: the client directory name followed by the installed version
+    """
     version = ""
     src = client.client_dir
     if src.joinpath(".version").exists():
         with open(src.joinpath(".version"), "r") as v:
             version = v.readlines()[0]
+    return f"{client.client_dir.name}_{version}"
+
 
+def backup_client_data(client: BaseWebClient) -> None:
     svc = BackupService()
-    target_path = svc.backup_root.joinpath(f"{client.client_dir.name}_{version}")
+    target_path = svc.backup_root.joinpath(get_client_backup_dir_name(client))
     svc.backup_directory(
         source_path=client.client_dir,
         target_path=target_path,
@@ -213,14 +222,8 @@ def backup_client_data(client: BaseWebClient) -> None:
 
 
 def backup_client_config_data(client: BaseWebClient) -> None:
-    version = ""
-    src = client.client_dir
-    if src.joinpath(".version").exists():
-        with open(src.joinpath(".version"), "r") as v:
-            version = v.readlines()[0]
-
     svc = BackupService()
-    target_path = svc.backup_root.joinpath(f"{client.client_dir.name}_{version}")
+    target_path = svc.backup_root.joinpath(get_client_backup_dir_name(client))
     svc.backup_directory(
         source_path=client.client_config.config_dir,
         target_path=target_path,
@@ -275,6 +278,30 @@ def get_download_url(base_url: str, client: BaseWebClient) -> str:
         return stable_url
 
 
+def get_pinned_download(client: BaseWebClient) -> Tuple[str, str | None]:
+    """
+    Get the download url of the client pinned to a release tag and the SHA-256
+    digest of that release archive. A 'latest' url is replaced by the url of
+    the release the digest was read from, so a release published in the
+    meantime can not be checked against the digest of the previous one
+    :param client: The client to get the download for
+    :return: the download url and the hex digest or None if GitHub does not
+             provide one
+    """
+    url = client.download_url
+    match = re.search(r"/releases/download/([^/]+)/", url)
+    tag = match.group(1) if match else None
+    zip_name = f"{client.name}.zip"
+    release_tag, sha256 = get_release_asset_sha256(client.repo_path, zip_name, tag)
+
+    if match is None and "/releases/latest/download/" in url:
+        if release_tag is None:
+            # the release is unknown, nothing to check the download against
+            return url, None
+        url = url.replace("/latest/download/", f"/download/{release_tag}/")
+    return url, sha256
+
+
 #################################################
 ## NGINX RELATED FUNCTIONS
 #################################################
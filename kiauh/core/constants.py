@@ -25,3 +25,7 @@ SYSTEMD = Path("/etc/systemd/system")
 NGINX_SITES_AVAILABLE = Path("/etc/nginx/sites-available")
 NGINX_SITES_ENABLED = Path("/etc/nginx/sites-enabled")
 NGINX_CONFD = Path("/etc/nginx/conf.d")
+
+# kiauh data dirs
+KIAUH_DATA_DIR = Path.home().joinpath(".kiauh")
+KIAUH_CACHE_DIR = KIAUH_DATA_DIR.joinpath("cache")
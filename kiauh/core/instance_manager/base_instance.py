@@ -10,7 +10,8 @@
 from __future__ import annotations
 
 import re
-from dataclasses import dataclass, field
+from dataclasses import dataclass
+from functools import cached_property
 from pathlib import Path
 from typing import List
 
@@ -20,30 +21,49 @@ from utils.fs_utils import get_data_dir
 # because they would cause conflicts with other components or are reserved
 SUFFIX_BLACKLIST: List[str] = ["None", "mcu", "obico", "bambu", "companion", "hmi"]
 
+
 @dataclass(repr=True)
 class BaseInstance:
+    """
+    The paths of an instance are resolved on first access, the data dir is
+    read from the service file, so creating an instance costs no file I/O.
+    """
+
     instance_type: type
     suffix: str
     log_file_name: str | None = None
-    data_dir: Path = field(init=False)
-    base_folders: List[Path] = field(init=False)
-    cfg_dir: Path = field(init=False)
-    log_dir: Path = field(init=False)
-    gcodes_dir: Path = field(init=False)
-    comms_dir: Path = field(init=False)
-    sysd_dir: Path = field(init=False)
-    is_legacy_instance: bool = field(init=False)
-
-    def __post_init__(self):
-        self.data_dir = get_data_dir(self.instance_type, self.suffix)
-        # the following attributes require the data_dir to be set
-        self.cfg_dir = self.data_dir.joinpath("config")
-        self.log_dir = self.data_dir.joinpath("logs")
-        self.gcodes_dir = self.data_dir.joinpath("gcodes")
-        self.comms_dir = self.data_dir.joinpath("comms")
-        self.sysd_dir = self.data_dir.joinpath("systemd")
-        self.is_legacy_instance = self._set_is_legacy_instance()
-        self.base_folders = [
+
+    @cached_property
+    def data_dir(self) -> Path:
+        return get_data_dir(self.instance_type, self.suffix)
+
+    @cached_property
+    def cfg_dir(self) -> Path:
+        return self.data_dir.joinpath("config")
+
+    @cached_property
+    def log_dir(self) -> Path:
+        return self.data_dir.joinpath("logs")
+
+    @cached_property
+    def gcodes_dir(self) -> Path:
+        return self.data_dir.joinpath("gcodes")
+
+    @cached_property
+    def comms_dir(self) -> Path:
+        return self.data_dir.joinpath("comms")
+
+    @cached_property
+    def sysd_dir(self) -> Path:
+        return self.data_dir.joinpath("systemd")
+
+    @cached_property
+    def is_legacy_instance(self) -> bool:
+        return self._set_is_legacy_instance()
+
+    @property
+    def base_folders(self) -> List[Path]:
+        return [
             self.data_dir,
             self.cfg_dir,
             self.log_dir,
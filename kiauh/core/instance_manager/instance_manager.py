@@ -14,7 +14,13 @@ from typing import List
 
 from core.logger import Logger
 from utils.instance_type import InstanceType
-from utils.sys_utils import cmd_sysctl_service
+from utils.sys_utils import (
+    SysCtlBatchError,
+    SysCtlBatchResult,
+    SysCtlServiceAction,
+    cmd_sysctl_service,
+    cmd_sysctl_services,
+)
 
 
 class InstanceManager:
@@ -64,19 +70,35 @@ class InstanceManager:
             raise
 
     @staticmethod
-    def start_all(instances: List[InstanceType]) -> None:
-        for instance in instances:
-            InstanceManager.start(instance)
+    def enable_all(instances: List[InstanceType]) -> SysCtlBatchResult:
+        try:
+            return InstanceManager._run_all(instances, "enable")
+        except SysCtlBatchError as e:
+            # like enable, a unit that could not be enabled is only reported
+            return e.result
+
+    @staticmethod
+    def start_all(instances: List[InstanceType]) -> SysCtlBatchResult:
+        return InstanceManager._run_all(instances, "start")
+
+    @staticmethod
+    def stop_all(instances: List[InstanceType]) -> SysCtlBatchResult:
+        return InstanceManager._run_all(instances, "stop")
 
     @staticmethod
-    def stop_all(instances: List[InstanceType]) -> None:
-        for instance in instances:
-            InstanceManager.stop(instance)
+    def restart_all(instances: List[InstanceType]) -> SysCtlBatchResult:
+        return InstanceManager._run_all(instances, "restart")
 
     @staticmethod
-    def restart_all(instances: List[InstanceType]) -> None:
-        for instance in instances:
-            InstanceManager.restart(instance)
+    def _run_all(
+        instances: List[InstanceType], action: SysCtlServiceAction
+    ) -> SysCtlBatchResult:
+        names: List[str] = [i.service_file_path.name for i in instances]
+        try:
+            return cmd_sysctl_services(names, action)
+        except CalledProcessError as e:
+            Logger.print_error(f"Error running {action} for {', '.join(names)}: {e}")
+            raise
 
     @staticmethod
     def remove(instance: InstanceType) -> None:
@@ -0,0 +1,100 @@
+# ======================================================================= #
+#  Copyright (C) 2020 - 2026 Dominik Willner <th33xitus@gmail.com>        #
+#                                                                         #
+#  This file is part of KIAUH - Klipper Installation And Update Helper    #
+#  https://github.com/dw-0/kiauh                                          #
+#                                                                         #
+#  This file may be distributed under the terms of the GNU GPLv3 license  #
+# ======================================================================= #
+from __future__ import annotations
+
+import os
+import re
+import threading
+from typing import Dict, List, Tuple
+
+from core.constants import SYSTEMD
+
+# a valid instance suffix, e.g. the "1" of klipper-1.service
+SUFFIX_PATTERN = re.compile(r"^[0-9a-zA-Z]+$")
+
+# (unit file name, instance suffix)
+ServiceUnit = Tuple[str, str]
+
+
+class InstanceRegistry:
+    """
+    Registry of the service units in the systemd directory, grouped by the
+    name of the component they belong to. The directory is listed once and
+    only listed again if its mtime changed, which happens whenever a unit
+    file is added or removed.
+    """
+
+    __cls_instance = None
+    __initialized = False
+
+    def __new__(cls) -> "InstanceRegistry":
+        if cls.__cls_instance is None:
+            cls.__cls_instance = super(InstanceRegistry, cls).__new__(cls)
+        return cls.__cls_instance
+
+    def __init__(self) -> None:
+        if self.__initialized:
+            return
+        self.__initialized = True
+        self._lock = threading.Lock()
+        self._mtime_ns: int | None = None
+        self._generation = 0
+        self._units: Dict[str, List[ServiceUnit]] = {}
+
+    @property
+    def generation(self) -> int:
+        """Incremented whenever the systemd directory was listed again"""
+        self._refresh()
+        return self._generation
+
+    def get_service_units(self, name: str) -> List[ServiceUnit]:
+        """
+        Get the service units of a component, e.g. 'klipper.service' and
+        'klipper-1.service' for the name 'klipper' |
+        :param name: the kebab-case name of the component
+        :return: List of unit file names and instance suffixes
+        """
+        self._refresh()
+        return list(self._units.get(name, []))
+
+    def invalidate(self) -> None:
+        """Force a new listing, e.g. after a unit file was written in place"""
+        with self._lock:
+            self._mtime_ns = None
+
+    def _refresh(self) -> None:
+        with self._lock:
+            try:
+                mtime_ns = os.stat(SYSTEMD).st_mtime_ns
+            except OSError:
+                mtime_ns = -1
+            if mtime_ns == self._mtime_ns:
+                return
+
+            units: Dict[str, List[ServiceUnit]] = {}
+            if mtime_ns != -1:
+                with os.scandir(SYSTEMD) as it:
+                    for entry in it:
+                        if entry.name.endswith(".service"):
+                            _add_unit(units, entry.name)
+            self._units = units
+            self._mtime_ns = mtime_ns
+            self._generation += 1
+
+
+def _add_unit(units: Dict[str, List[ServiceUnit]], file_name: str) -> None:
+    # equivalent to matching '^{name}(-[0-9a-zA-Z]+)?.service$' against the
+    # file name for every possible name: a unit belongs to the name equal to
+    # its stem and, if the last hyphen separated part is a valid suffix, to
+    # the name before that part
+    stem = file_name[: -len(".service")]
+    units.setdefault(stem, []).append((file_name, ""))
+    name, _, suffix = stem.rpartition("-")
+    if name and SUFFIX_PATTERN.match(suffix):
+        units.setdefault(name, []).append((file_name, suffix))
@@ -0,0 +1,69 @@
+# ======================================================================= #
+#  Copyright (C) 2020 - 2026 Dominik Willner <th33xitus@gmail.com>        #
+#                                                                         #
+#  This file is part of KIAUH - Klipper Installation And Update Helper    #
+#  https://github.com/dw-0/kiauh                                          #
+#                                                                         #
+#  This file may be distributed under the terms of the GNU GPLv3 license  #
+# ======================================================================= #
+import os
+
+import pytest
+from core.instance_manager import instance_registry
+from core.instance_manager.instance_registry import InstanceRegistry
+from utils.instance_utils import get_instances
+
+
+class Klipper:
+    def __init__(self, suffix: str) -> None:
+        self.suffix = suffix
+
+
+@pytest.fixture
+def systemd_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(instance_registry, "SYSTEMD", tmp_path)
+    InstanceRegistry().invalidate()
+    yield tmp_path
+    InstanceRegistry().invalidate()
+
+
+def _add_units(path, *names):
+    for name in names:
+        path.joinpath(name).touch()
+
+
+def _bump_mtime(path):
+    # the directory mtime may not change within the timestamp granularity
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+def test_registry_is_a_singleton():
+    assert InstanceRegistry() is InstanceRegistry()
+
+
+def test_units_are_grouped_by_name(systemd_dir):
+    _add_units(systemd_dir, "klipper.service", "klipper-1.service", "foo.timer")
+
+    units = InstanceRegistry().get_service_units("klipper")
+
+    assert sorted(units) == [("klipper-1.service", "1"), ("klipper.service", "")]
+
+
+def test_generation_survives_new_registry_instances(systemd_dir):
+    _add_units(systemd_dir, "klipper-1.service")
+    generation = InstanceRegistry().generation
+
+    assert InstanceRegistry().generation == generation
+
+
+def test_removed_unit_file_changes_instances(systemd_dir):
+    _add_units(systemd_dir, "klipper-1.service", "klipper-2.service")
+    assert [i.suffix for i in get_instances(Klipper)] == ["1", "2"]
+    generation = InstanceRegistry().generation
+
+    systemd_dir.joinpath("klipper-2.service").unlink()
+    _bump_mtime(systemd_dir)
+
+    assert InstanceRegistry().generation > generation
+    assert [i.suffix for i in get_instances(Klipper)] == ["1"]
@@ -26,6 +26,7 @@ from components.moonraker import MOONRAKER_DIR
 from components.moonraker.moonraker import Moonraker
 from core.menus import Option
 from core.menus.base_menu import BaseMenu
+from core.services.wheelhouse import prebuild_wheels
 from core.types.color import Color
 from procedures.system import change_system_hostname
 from utils.git_utils import rollback_repository
@@ -55,6 +56,7 @@ class AdvancedMenu(BaseMenu):
             "6": Option(method=self.klipper_rollback),
             "7": Option(method=self.moonraker_rollback),
             "8": Option(method=self.change_hostname),
+            "9": Option(method=self.prebuild_wheels),
         }
 
     def print_menu(self) -> None:
@@ -67,8 +69,8 @@ class AdvancedMenu(BaseMenu):
             ║  3) [Build + Flash]       │                           ║
             ║  4) [Get MCU ID]          │ System:                   ║
             ║                           │  8) [Change hostname]     ║
-            ║ Extra Dependencies:       │                           ║
-            ║  5) [Input Shaper]        │                           ║
+            ║ Extra Dependencies:       │ Python:                   ║
+            ║  5) [Input Shaper]        │  9) [Prebuild wheels]     ║
             ╟───────────────────────────┴───────────────────────────╢
             """
         )[1:]
@@ -104,3 +106,6 @@ class AdvancedMenu(BaseMenu):
 
     def input_shaper(self, **kwargs) -> None:
         install_input_shaper_deps()
+
+    def prebuild_wheels(self, **kwargs) -> None:
+        prebuild_wheels()
@@ -25,6 +25,7 @@ from components.webui_client.fluidd_data import FluiddData
 from components.webui_client.mainsail_data import MainsailData
 from core.menus import Option
 from core.menus.base_menu import BaseMenu
+from core.services.backup_job import BackupJob, plan_full_backup
 from core.services.backup_service import BackupService
 from core.types.color import Color
 
@@ -54,6 +55,8 @@ class BackupMenu(BaseMenu):
             "7": Option(method=self.backup_mainsail_config),
             "8": Option(method=self.backup_fluidd_config),
             "9": Option(method=self.backup_klipperscreen),
+            "10": Option(method=self.backup_everything),
+            "11": Option(method=self.verify_backups),
         }
 
     def print_menu(self) -> None:
@@ -72,8 +75,11 @@ class BackupMenu(BaseMenu):
             ║  4) [Moonraker Database]  │ Touchscreen GUI:          ║
             ║                           │  9) [KlipperScreen]       ║
             ║ Webinterface:             │                           ║
-            ║  5) [Mainsail]            │                           ║
-            ║  6) [Fluidd]              │                           ║
+            ║  5) [Mainsail]            │ All of the above:         ║
+            ║  6) [Fluidd]              │ 10) [Everything]          ║
+            ║                           │                           ║
+            ║                           │ Integrity:                ║
+            ║                           │ 11) [Verify Backups]      ║
             ╟───────────────────────────┴───────────────────────────╢
             """
         )[1:]
@@ -105,3 +111,9 @@ class BackupMenu(BaseMenu):
 
     def backup_klipperscreen(self, **kwargs) -> None:
         backup_klipperscreen_dir()
+
+    def backup_everything(self, **kwargs) -> None:
+        BackupJob(plan_full_backup()).run()
+
+    def verify_backups(self, **kwargs) -> None:
+        BackupService().verify()
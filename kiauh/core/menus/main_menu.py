@@ -10,7 +10,7 @@ from __future__ import annotations
 
 import sys
 import textwrap
-from typing import Callable, Type
+from typing import Type
 
 from components.crowsnest.crowsnest import get_crowsnest_status
 from components.klipper.klipper_utils import get_klipper_status
@@ -32,6 +32,7 @@ from core.menus.install_menu import InstallMenu
 from core.menus.remove_menu import RemoveMenu
 from core.menus.settings_menu import SettingsMenu
 from core.menus.update_menu import UpdateMenu
+from core.services.status_service import StatusProbe, StatusService
 from core.types.color import Color
 from core.types.component_status import ComponentStatus, StatusMap, StatusText
 from extensions.extensions_menu import ExtensionsMenu
@@ -83,16 +84,18 @@ class MainMenu(BaseMenu):
 
     def _fetch_status(self) -> None:
         self.version = get_kiauh_version()
-        self._get_component_status("kl", get_klipper_status)
-        self._get_component_status("mr", get_moonraker_status)
-        self._get_component_status("ms", get_client_status, MainsailData())
-        self._get_component_status("fl", get_client_status, FluiddData())
-        self._get_component_status("ks", get_klipperscreen_status)
-        self._get_component_status("cn", get_crowsnest_status)
+        probes = [
+            StatusProbe("kl", get_klipper_status),
+            StatusProbe("mr", get_moonraker_status),
+            StatusProbe("ms", get_client_status, (MainsailData(),)),
+            StatusProbe("fl", get_client_status, (FluiddData(),)),
+            StatusProbe("ks", get_klipperscreen_status),
+            StatusProbe("cn", get_crowsnest_status),
+        ]
+        StatusService().collect(probes, on_result=self._set_component_status)
         self.cc_status = get_current_client_config()
 
-    def _get_component_status(self, name: str, status_fn: Callable, *args) -> None:
-        status_data: ComponentStatus = status_fn(*args)
+    def _set_component_status(self, name: str, status_data: ComponentStatus) -> None:
         code: int = status_data.status
         status: StatusText = StatusMap[code]
         owner: str = trunc_string(status_data.owner, 23) if status_data.owner else '-'
@@ -115,6 +118,8 @@ class MainMenu(BaseMenu):
             color = Color.YELLOW
         elif code == 2:
             color = Color.GREEN
+        elif code in (3, 4):
+            color = Color.YELLOW
 
         return Color.apply(f"{status}{count}", color)
 
@@ -9,7 +9,7 @@
 from __future__ import annotations
 
 import textwrap
-from typing import Callable, List, Type
+from typing import Callable, Dict, List, Type
 
 from components.crowsnest.crowsnest import get_crowsnest_status, update_crowsnest
 from components.klipper.klipper_utils import (
@@ -35,8 +35,9 @@ from components.webui_client.mainsail_data import MainsailData
 from core.logger import DialogType, Logger
 from core.menus import Option
 from core.menus.base_menu import BaseMenu
+from core.services.status_service import StatusProbe, StatusService
 from core.types.color import Color
-from core.types.component_status import ComponentStatus
+from core.types.component_status import ComponentStatus, StatusMap
 from utils.input_utils import get_confirm
 from utils.sys_utils import (
     get_upgradable_packages,
@@ -237,19 +238,24 @@ class UpdateMenu(BaseMenu):
     def upgrade_system_packages(self, **kwargs) -> None:
         self._run_system_updates()
 
+    def _get_status_probes(self) -> Dict[str, StatusProbe]:
+        probes = [
+            StatusProbe("klipper", get_klipper_status),
+            StatusProbe("moonraker", get_moonraker_status),
+            StatusProbe("mainsail", get_client_status, (self.mainsail_data, True)),
+            StatusProbe(
+                "mainsail_config", get_client_config_status, (self.mainsail_data,)
+            ),
+            StatusProbe("fluidd", get_client_status, (self.fluidd_data, True)),
+            StatusProbe("fluidd_config", get_client_config_status, (self.fluidd_data,)),
+            StatusProbe("klipperscreen", get_klipperscreen_status),
+            StatusProbe("crowsnest", get_crowsnest_status),
+        ]
+        return {probe.name: probe for probe in probes}
+
     def _fetch_update_status(self) -> None:
-        self._set_status_data("klipper", get_klipper_status)
-        self._set_status_data("moonraker", get_moonraker_status)
-        self._set_status_data("mainsail", get_client_status, self.mainsail_data, True)
-        self._set_status_data(
-            "mainsail_config", get_client_config_status, self.mainsail_data
-        )
-        self._set_status_data("fluidd", get_client_status, self.fluidd_data, True)
-        self._set_status_data(
-            "fluidd_config", get_client_config_status, self.fluidd_data
-        )
-        self._set_status_data("klipperscreen", get_klipperscreen_status)
-        self._set_status_data("crowsnest", get_crowsnest_status)
+        probes = list(self._get_status_probes().values())
+        StatusService().collect(probes, on_result=self._set_status_data)
 
         self._fetch_system_package_update_status()
 
@@ -269,13 +275,18 @@ class UpdateMenu(BaseMenu):
 
         return str(Color.apply(local_version or '-', color))
 
-    def _set_status_data(self, name: str, status_fn: Callable, *args) -> None:
-        comp_status: ComponentStatus = status_fn(*args)
-
+    def _set_status_data(self, name: str, comp_status: ComponentStatus) -> None:
         self.status_data[name]["installed"] = True if comp_status.status == 2 else False
         self.status_data[name]["local"] = comp_status.local
         self.status_data[name]["remote"] = comp_status.remote
 
+        if comp_status.status in (3, 4):
+            # the status could not be determined, do not show stale versions
+            text = Color.apply(StatusMap[comp_status.status], Color.YELLOW)
+            setattr(self, f"{name}_local", text)
+            setattr(self, f"{name}_remote", text)
+            return
+
         self._set_status_string(name)
 
     def _set_status_string(self, name: str) -> None:
@@ -319,22 +330,10 @@ class UpdateMenu(BaseMenu):
 
     def _refresh_component_status(self, name: str) -> None:
         """Refresh the status data for a component after an update."""
-        if name == "klipper":
-            self._set_status_data("klipper", get_klipper_status)
-        elif name == "moonraker":
-            self._set_status_data("moonraker", get_moonraker_status)
-        elif name == "mainsail":
-            self._set_status_data("mainsail", get_client_status, self.mainsail_data, True)
-        elif name == "mainsail_config":
-            self._set_status_data("mainsail_config", get_client_config_status, self.mainsail_data)
-        elif name == "fluidd":
-            self._set_status_data("fluidd", get_client_status, self.fluidd_data, True)
-        elif name == "fluidd_config":
-            self._set_status_data("fluidd_config", get_client_config_status, self.fluidd_data)
-        elif name == "klipperscreen":
-            self._set_status_data("klipperscreen", get_klipperscreen_status)
-        elif name == "crowsnest":
-            self._set_status_data("crowsnest", get_crowsnest_status)
+        probe = self._get_status_probes().get(name)
+        if probe is None:
+            return
+        StatusService().collect([probe], on_result=self._set_status_data)
 
     def _run_system_updates(self) -> None:
         if not self.packages:
@@ -0,0 +1,210 @@
+# ======================================================================= #
+#  Copyright (C) 2020 - 2026 Dominik Willner <th33xitus@gmail.com>        #
+#                                                                         #
+#  This file is part of KIAUH - Klipper Installation And Update Helper    #
+#  https://github.com/dw-0/kiauh                                          #
+#                                                                         #
+#  This file may be distributed under the terms of the GNU GPLv3 license  #
+# ======================================================================= #
+from __future__ import annotations
+
+import hashlib
+import os
+import tarfile
+from contextlib import ExitStack, contextmanager
+from pathlib import Path
+from typing import BinaryIO, Dict, Iterator, List, Literal, Set, Tuple
+
+from core.services.backup_store import HASH_CHUNK_SIZE, walk_directory
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+ArchiveCodec = Literal["gzip", "xz", "zstd"]
+ARCHIVE_CODECS: Tuple[ArchiveCodec, ...] = ("gzip", "xz", "zstd")
+DEFAULT_ARCHIVE_CODEC: ArchiveCodec = "gzip"
+ARCHIVE_SUFFIXES: Dict[ArchiveCodec, str] = {
+    "gzip": ".tar.gz",
+    "xz": ".tar.xz",
+    "zstd": ".tar.zst",
+}
+
+
+class ArchiveError(Exception):
+    pass
+
+
+def get_available_codecs() -> List[ArchiveCodec]:
+    """
+    Return the codecs archives can be written with. zstd requires the
+    optional 'zstandard' module |
+    :return: List of available codecs
+    """
+    return [c for c in ARCHIVE_CODECS if c != "zstd" or zstandard is not None]
+
+
+def get_archive_codec(path: Path) -> ArchiveCodec | None:
+    """
+    Get the codec of an archive from its file name |
+    :param path: Path of the archive
+    :return: the codec or None if the path is no backup archive
+    """
+    for codec, suffix in ARCHIVE_SUFFIXES.items():
+        if path.name.endswith(suffix):
+            return codec
+    return None
+
+
+class _HashingReader:
+    """File object wrapper that hashes everything read through it"""
+
+    def __init__(self, f: BinaryIO) -> None:
+        self._f = f
+        self._hasher = hashlib.sha256()
+
+    def read(self, size: int = -1) -> bytes:
+        data = self._f.read(size)
+        self._hasher.update(data)
+        return data
+
+    def hexdigest(self) -> str:
+        return self._hasher.hexdigest()
+
+
+def write_archive(source: Path, archive: Path, codec: ArchiveCodec) -> Dict[str, str]:
+    """
+    Write a directory into a compressed tar archive in a single pass. The tar
+    stream is compressed while it is written, so memory usage is bounded and
+    the archive is written as one sequential file. It is written to a
+    temporary file first and only moved to the target path when complete.
+    Files are hashed while they are read into the archive |
+    :param source: the directory to archive
+    :param archive: path of the archive to create
+    :param codec: compression codec
+    :return: the SHA-256 digests of the archived files by their member name
+    """
+    part = archive.with_name(f"{archive.name}.part")
+    digests: Dict[str, str] = {}
+    try:
+        with _open_tar(part, "w", codec) as tar:
+            for entry in walk_directory(source):
+                path = source.joinpath(entry.path)
+                if entry.type != "file":
+                    tar.add(path, arcname=entry.path, recursive=False)
+                    continue
+                tarinfo = tar.gettarinfo(path, arcname=entry.path)
+                if tarinfo.islnk():
+                    # hardlink to a file that is already part of the archive
+                    tar.addfile(tarinfo)
+                    digests[entry.path] = digests[tarinfo.linkname]
+                    continue
+                with open(path, "rb") as f:
+                    reader = _HashingReader(f)
+                    tar.addfile(tarinfo, reader)
+                digests[entry.path] = reader.hexdigest()
+        os.replace(part, archive)
+    except BaseException:
+        part.unlink(missing_ok=True)
+        raise
+    return digests
+
+
+def list_archive(archive: Path) -> List[tarfile.TarInfo]:
+    """
+    List the members of a backup archive without extracting it |
+    :param archive: path of the archive
+    :return: List of the archive members
+    """
+    with _open_tar(archive, "r", _get_codec(archive)) as tar:
+        return [member for member in tar]
+
+
+def hash_archive(archive: Path) -> Dict[str, str]:
+    """
+    Hash all files of a backup archive in a single pass, without
+    extracting it |
+    :param archive: path of the archive
+    :return: the SHA-256 digests of the files by their member name
+    """
+    digests: Dict[str, str] = {}
+    with _open_tar(archive, "r", _get_codec(archive)) as tar:
+        for member in tar:
+            if member.islnk():
+                digests[member.name] = digests.get(member.linkname, "")
+                continue
+            if not member.isreg():
+                continue
+            hasher = hashlib.sha256()
+            f = tar.extractfile(member)
+            while chunk := f.read(HASH_CHUNK_SIZE):
+                hasher.update(chunk)
+            digests[member.name] = hasher.hexdigest()
+    return digests
+
+
+def extract_archive(
+    archive: Path, target: Path, members: Set[str] | None = None
+) -> None:
+    """
+    Extract a backup archive in a single pass. Members that would be written
+    outside of the target directory are rejected |
+    :param archive: path of the archive
+    :param target: the directory to extract into
+    :param members: optional, only extract the members with these names
+    :return: None
+    """
+    target.mkdir(parents=True, exist_ok=True)
+    root = target.resolve()
+    # the members are checked below, newer Python versions would additionally
+    # reject the absolute symlinks every virtualenv contains
+    kwargs = {"filter": "fully_trusted"} if hasattr(tarfile, "data_filter") else {}
+    with _open_tar(archive, "r", _get_codec(archive)) as tar:
+        for member in tar:
+            # resolving the parent also rejects paths through an extracted symlink
+            parent = root.joinpath(member.name).parent.resolve()
+            if Path(member.name).name in ("", "..") or (
+                parent != root and root not in parent.parents
+            ):
+                raise ArchiveError(f"Illegal path in archive: '{member.name}'")
+            if member.islnk():
+                link_target = root.joinpath(member.linkname).resolve()
+                if root not in link_target.parents:
+                    raise ArchiveError(f"Illegal link in archive: '{member.name}'")
+            elif not (member.isdir() or member.isreg() or member.issym()):
+                # device files and fifos are never part of a backup
+                continue
+            if members is not None and member.name not in members:
+                continue
+            tar.extract(member, root, **kwargs)
+
+
+def _get_codec(archive: Path) -> ArchiveCodec:
+    codec = get_archive_codec(archive)
+    if codec is None:
+        raise ArchiveError(f"'{archive}' is not a backup archive")
+    return codec
+
+
+@contextmanager
+def _open_tar(
+    path: Path, mode: Literal["r", "w"], codec: ArchiveCodec
+) -> Iterator[tarfile.TarFile]:
+    # the stream modes ("r|", "w|") never seek and only buffer a single block
+    with ExitStack() as stack:
+        if codec == "zstd":
+            if zstandard is None:
+                raise ArchiveError("zstd requires the 'zstandard' Python module")
+            f: BinaryIO = stack.enter_context(open(path, f"{mode}b"))
+            if mode == "w":
+                stream = zstandard.ZstdCompressor().stream_writer(f)
+            else:
+                stream = zstandard.ZstdDecompressor().stream_reader(f)
+            stack.enter_context(stream)
+            tar = tarfile.open(fileobj=stream, mode=f"{mode}|")
+        else:
+            comp = "gz" if codec == "gzip" else "xz"
+            tar = tarfile.open(path.as_posix(), mode=f"{mode}|{comp}")
+        with tar:
+            yield tar
@@ -0,0 +1,184 @@
+# ======================================================================= #
+#  Copyright (C) 2020 - 2026 Dominik Willner <th33xitus@gmail.com>        #
+#                                                                         #
+#  This file is part of KIAUH - Klipper Installation And Update Helper    #
+#  https://github.com/dw-0/kiauh                                          #
+#                                                                         #
+#  This file may be distributed under the terms of the GNU GPLv3 license  #
+# ======================================================================= #
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+from core.services.backup_archive import get_archive_codec, hash_archive
+from core.services.backup_store import (
+    HASH_CHUNK_SIZE,
+    MANIFEST_SUFFIX,
+    BackupManifest,
+    BackupStore,
+)
+
+# sidecar of a backup, e.g. config_20250101-120000.checksums.json
+CHECKSUMS_SUFFIX = ".checksums.json"
+CHECKSUMS_VERSION = 1
+VERIFY_WORKERS = 4
+
+
+@dataclass
+class VerifyResult:
+    backup: Path
+    checked: int = 0
+    # relative paths of the files
+    corrupted: List[str] = field(default_factory=list)
+    missing: List[str] = field(default_factory=list)
+    # backups created without checksums can not be verified
+    has_checksums: bool = True
+    error: str | None = None
+
+    @property
+    def ok(self) -> bool:
+        return (
+            self.has_checksums
+            and self.error is None
+            and not (self.corrupted or self.missing)
+        )
+
+
+def get_checksums_path(backup: Path) -> Path:
+    return backup.with_name(f"{backup.name}{CHECKSUMS_SUFFIX}")
+
+
+def save_checksums(backup: Path, digests: Dict[str, str]) -> None:
+    """
+    Write the checksum sidecar of a backup atomically |
+    :param backup: path of the backup
+    :param digests: SHA-256 digests by the relative path of the files
+    :return: None
+    """
+    path = get_checksums_path(backup)
+    data = {"version": CHECKSUMS_VERSION, "algorithm": "sha256", "files": digests}
+    fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f, separators=(",", ":"))
+        os.replace(tmp, path)
+    except OSError:
+        Path(tmp).unlink(missing_ok=True)
+        raise
+
+
+def load_checksums(backup: Path) -> Dict[str, str] | None:
+    """
+    Load the checksum sidecar of a backup |
+    :param backup: path of the backup
+    :return: the digests by relative path or None if there are no checksums
+    """
+    try:
+        with open(get_checksums_path(backup), "r", encoding="utf-8") as f:
+            return dict(json.load(f)["files"])
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+
+def hash_file(path: Path | str) -> str:
+    hasher = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(HASH_CHUNK_SIZE):
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+def copy_and_hash(source: Path | str, target: Path | str) -> str:
+    """
+    Copy a file like shutil.copy2 and hash it while it is copied, so the
+    file is only read once |
+    :param source: the file to copy
+    :param target: path of the copy
+    :return: the SHA-256 digest of the copied data
+    """
+    hasher = hashlib.sha256()
+    with open(source, "rb") as src, open(target, "wb") as dst:
+        while chunk := src.read(HASH_CHUNK_SIZE):
+            hasher.update(chunk)
+            dst.write(chunk)
+    shutil.copystat(source, target)
+    return hasher.hexdigest()
+
+
+def verify_backup(
+    backup: Path, store: BackupStore, max_workers: int = VERIFY_WORKERS
+) -> VerifyResult:
+    """
+    Re-hash the files of a backup and compare them with the digests recorded
+    when the backup was created. Files are hashed in parallel, archives are
+    read in a single pass |
+    :param backup: path of the backup
+    :param store: the content-addressed store of dedup backups
+    :param max_workers: amount of files hashed at once
+    :return: the corrupted and missing files of the backup
+    """
+    result = VerifyResult(backup)
+    try:
+        if backup.name.endswith(MANIFEST_SUFFIX):
+            # the blobs are named after their digest, each blob is hashed once
+            manifest = BackupManifest.load(backup)
+            blobs: Dict[str, str] = {}
+            for e in manifest.entries:
+                if e.sha256 is not None:
+                    blobs.setdefault(e.sha256, e.path)
+            jobs = [(p, store.blob_path(d), d) for d, p in blobs.items()]
+            _verify_files(result, jobs, max_workers)
+            return result
+
+        digests = load_checksums(backup)
+        if digests is None:
+            result.has_checksums = False
+        elif get_archive_codec(backup) is not None:
+            try:
+                actual = hash_archive(backup)
+            except Exception as e:
+                # zlib, lzma or zstd errors, a damaged compressed stream
+                # can not be read past the damage
+                result.error = f"archive is damaged: {e}"
+                return result
+            result.checked = len(digests)
+            for path, digest in digests.items():
+                if path not in actual:
+                    result.missing.append(path)
+                elif actual[path] != digest:
+                    result.corrupted.append(path)
+        elif backup.is_dir():
+            jobs = [(p, backup.joinpath(p), d) for p, d in digests.items()]
+            _verify_files(result, jobs, max_workers)
+        else:
+            jobs = [(p, backup, d) for p, d in digests.items()]
+            _verify_files(result, jobs, max_workers)
+    except (OSError, ValueError, KeyError, TypeError) as e:
+        result.error = str(e)
+    return result
+
+
+def _verify_files(
+    result: VerifyResult, jobs: List[Tuple[str, Path, str]], max_workers: int
+) -> None:
+    def check(job: Tuple[str, Path, str]) -> str | None:
+        try:
+            return hash_file(job[1])
+        except FileNotFoundError:
+            return None
+
+    with ThreadPoolExecutor(max_workers=max(max_workers, 1)) as executor:
+        for (name, _, digest), actual in zip(jobs, executor.map(check, jobs)):
+            result.checked += 1
+            if actual is None:
+                result.missing.append(name)
+            elif actual != digest:
+                result.corrupted.append(name)
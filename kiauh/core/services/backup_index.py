@@ -0,0 +1,151 @@
+# ======================================================================= #
+#  Copyright (C) 2020 - 2026 Dominik Willner <th33xitus@gmail.com>        #
+#                                                                         #
+#  This file is part of KIAUH - Klipper Installation And Update Helper    #
+#  https://github.com/dw-0/kiauh                                          #
+#                                                                         #
+#  This file may be distributed under the terms of the GNU GPLv3 license  #
+# ======================================================================= #
+from __future__ import annotations
+
+import json
+import os
+import tempfile
+import threading
+from dataclasses import asdict, dataclass
+from json import JSONDecodeError
+from pathlib import Path
+from typing import Dict, Iterable, List
+
+from core.services.backup_archive import get_archive_codec
+from core.services.backup_retention import scan_backups
+from core.services.backup_store import MANIFEST_SUFFIX
+
+INDEX_FILE_NAME = "index.json"
+
+# the backup service may be used from several threads at once
+_index_lock = threading.Lock()
+
+
+@dataclass
+class BackupRecord:
+    # path relative to the backup root
+    path: str
+    name: str
+    timestamp: str
+    # copy, dedup, snapshot, archive or file
+    mode: str
+    # the backed up path, empty if unknown
+    source: str = ""
+
+
+class BackupIndex:
+    """
+    Index of all backups in the backup root, so backups can be listed without
+    walking the backup directories. Backups that were created by older
+    versions, or while the index was unreadable, are added by a rescan.
+    """
+
+    def __init__(self, backup_root: Path) -> None:
+        self._backup_root = backup_root
+        self._index_file = backup_root.joinpath(INDEX_FILE_NAME)
+
+    @property
+    def backup_root(self) -> Path:
+        return self._backup_root
+
+    def add(self, record: BackupRecord) -> None:
+        with _index_lock:
+            records = self._read()
+            if records is None:
+                records = self._rebuild()
+            records[record.path] = record
+            self._write(records)
+
+    def remove(self, paths: Iterable[Path]) -> None:
+        with _index_lock:
+            records = self._read()
+            if records is None:
+                # rebuilt without the removed backups by the next listing
+                return
+            for path in paths:
+                records.pop(self._relative(path), None)
+            self._write(records)
+
+    def list(self, name: str | None = None) -> List[BackupRecord]:
+        """
+        List all backups, newest first |
+        :param name: optional, only list backups with this backup name
+        :return: List of backup records
+        """
+        with _index_lock:
+            records = self._read()
+            if records is None:
+                records = self._rebuild()
+        backups = [
+            r
+            for r in records.values()
+            if (name is None or r.name == name) and self.resolve(r).exists()
+        ]
+        return sorted(backups, key=lambda r: r.timestamp, reverse=True)
+
+    def resolve(self, record: BackupRecord) -> Path:
+        return self._backup_root.joinpath(record.path)
+
+    def rebuild(self) -> List[BackupRecord]:
+        """
+        Rescan the backup root and rewrite the index. Records of backups that
+        still exist keep their source |
+        :return: List of all backup records
+        """
+        with _index_lock:
+            return list(self._rebuild().values())
+
+    def _rebuild(self) -> Dict[str, BackupRecord]:
+        known = self._read() or {}
+        records: Dict[str, BackupRecord] = {}
+        for entry in scan_backups(self._backup_root):
+            path = self._relative(entry.path)
+            records[path] = known.get(path) or BackupRecord(
+                path=path,
+                name=entry.name,
+                timestamp=entry.timestamp.strftime("%Y%m%d-%H%M%S"),
+                mode=get_backup_mode(entry.path, entry.is_dir),
+            )
+        self._write(records)
+        return records
+
+    def _relative(self, path: Path) -> str:
+        return path.relative_to(self._backup_root).as_posix()
+
+    def _read(self) -> Dict[str, BackupRecord] | None:
+        try:
+            with open(self._index_file, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            return {r["path"]: BackupRecord(**r) for r in data["backups"]}
+        except (OSError, JSONDecodeError, KeyError, TypeError):
+            return None
+
+    def _write(self, records: Dict[str, BackupRecord] | None) -> None:
+        # failing to write the index is not considered an error,
+        # it is rebuilt by the next listing
+        try:
+            self._backup_root.mkdir(parents=True, exist_ok=True)
+            data = {"backups": [asdict(r) for r in (records or {}).values()]}
+            fd, tmp = tempfile.mkstemp(dir=self._backup_root, suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(data, f, indent=1)
+            os.replace(tmp, self._index_file)
+        except OSError:
+            return
+
+
+def get_backup_mode(path: Path, is_dir: bool) -> str:
+    """Guess the mode a backup was created with from its path"""
+    if is_dir:
+        return "copy"
+    if path.name.endswith(MANIFEST_SUFFIX):
+        return "dedup"
+    if get_archive_codec(path) is not None:
+        return "archive"
+    return "file"
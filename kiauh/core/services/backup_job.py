@@ -0,0 +1,243 @@
+# ======================================================================= #
+#  Copyright (C) 2020 - 2026 Dominik Willner <th33xitus@gmail.com>        #
+#                                                                         #
+#  This file is part of KIAUH - Klipper Installation And Update Helper    #
+#  https://github.com/dw-0/kiauh                                          #
+#                                                                         #
+#  This file may be distributed under the terms of the GNU GPLv3 license  #
+# ======================================================================= #
+from __future__ import annotations
+
+import os
+import stat
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import List, Set
+
+from components.klipper import KLIPPER_DIR, KLIPPER_ENV_DIR
+from components.klipper.klipper import Klipper
+from components.klipperscreen import KLIPPERSCREEN_DIR, KLIPPERSCREEN_ENV_DIR
+from components.moonraker import MOONRAKER_DIR, MOONRAKER_ENV_DIR
+from components.moonraker.moonraker import Moonraker
+from components.webui_client.client_utils import (
+    get_client_backup_dir_name,
+    get_existing_clients,
+)
+from core.logger import Logger
+from core.services.backup_service import BackupService
+from utils.instance_utils import get_instances
+
+# backups are I/O bound, more parallel copies only compete for the same disk
+BACKUP_JOB_WORKERS = 3
+
+
+@dataclass
+class BackupTarget:
+    label: str
+    source: Path
+    backup_name: str
+    target_path: str | None = None
+    is_file: bool = False
+    files: int = 0
+    size: int = 0
+
+
+@dataclass
+class BackupJobResult:
+    succeeded: List[BackupTarget] = field(default_factory=list)
+    failed: List[BackupTarget] = field(default_factory=list)
+
+
+def plan_full_backup() -> List[BackupTarget]:
+    """
+    Collect everything that can be backed up: Klipper, Moonraker, the config
+    and database directory of each instance, the web clients and their
+    configs, and KlipperScreen. Targets that do not exist are skipped |
+    :return: List of backup targets
+    """
+    targets: List[BackupTarget] = [
+        BackupTarget("Klipper", KLIPPER_DIR, "klipper", "klipper"),
+        BackupTarget("Klipper env", KLIPPER_ENV_DIR, "klippy-env", "klipper"),
+        BackupTarget("Moonraker", MOONRAKER_DIR, "moonraker", "moonraker"),
+        BackupTarget("Moonraker env", MOONRAKER_ENV_DIR, "moonraker-env", "moonraker"),
+    ]
+
+    kl_data_dirs = [i.data_dir for i in get_instances(Klipper)]
+    for data_dir in kl_data_dirs or _find_printer_data_dirs():
+        targets.append(
+            BackupTarget(
+                f"{data_dir.name} config",
+                data_dir.joinpath("config"),
+                "config",
+                data_dir.name,
+            )
+        )
+
+    mr_data_dirs = [i.data_dir for i in get_instances(Moonraker)]
+    for data_dir in mr_data_dirs or _find_printer_data_dirs():
+        targets.append(
+            BackupTarget(
+                f"{data_dir.name} database",
+                data_dir.joinpath("database"),
+                "database",
+                data_dir.name,
+            )
+        )
+
+    for client in get_existing_clients():
+        target_path = get_client_backup_dir_name(client)
+        client_config = client.client_config
+        targets.extend(
+            [
+                BackupTarget(
+                    client.display_name, client.client_dir, client.name, target_path
+                ),
+                BackupTarget(
+                    f"{client.display_name} config file",
+                    client.config_file,
+                    client.config_file.stem,
+                    target_path,
+                    is_file=True,
+                ),
+                BackupTarget(
+                    client_config.display_name,
+                    client_config.config_dir,
+                    client_config.name,
+                    target_path,
+                ),
+            ]
+        )
+
+    targets.extend(
+        [
+            BackupTarget(
+                "KlipperScreen", KLIPPERSCREEN_DIR, "KlipperScreen", "KlipperScreen"
+            ),
+            BackupTarget(
+                "KlipperScreen env",
+                KLIPPERSCREEN_ENV_DIR,
+                "KlipperScreen-env",
+                "KlipperScreen",
+            ),
+        ]
+    )
+
+    seen: Set[Path] = set()
+    planned: List[BackupTarget] = []
+    for target in targets:
+        exists = target.source.is_file() if target.is_file else target.source.is_dir()
+        if exists and target.source not in seen:
+            seen.add(target.source)
+            planned.append(target)
+    return planned
+
+
+class BackupJob:
+    """
+    Backs up several targets at once on a thread pool. All targets are
+    measured first, so the progress can be shown as the total amount of
+    files and bytes backed up so far. The retention policy is applied once,
+    after all backups are done.
+    """
+
+    def __init__(
+        self, targets: List[BackupTarget], max_workers: int = BACKUP_JOB_WORKERS
+    ) -> None:
+        self._targets = targets
+        self._max_workers = max(max_workers, 1)
+
+    def run(self) -> BackupJobResult:
+        # resolve the settings before any worker thread needs them
+        from core.settings.kiauh_settings import KiauhSettings
+
+        KiauhSettings()
+
+        result = BackupJobResult()
+        if not self._targets:
+            Logger.print_info("Nothing to backup!")
+            return result
+
+        svc = BackupService(silent=True, auto_prune=False)
+        with ThreadPoolExecutor(max_workers=self._max_workers) as executor:
+            list(executor.map(self._measure, self._targets))
+
+            total = len(self._targets)
+            total_files = sum(t.files for t in self._targets)
+            total_size = sum(t.size for t in self._targets)
+            Logger.print_status(
+                f"Backing up {total} targets ({total_files} files,"
+                f" {_format_size(total_size)}) ..."
+            )
+
+            futures = {
+                executor.submit(self._backup, svc, target): target
+                for target in self._targets
+            }
+            done_files = done_size = 0
+            for count, future in enumerate(as_completed(futures), start=1):
+                target = futures[future]
+                done_files += target.files
+                done_size += target.size
+                progress = (
+                    f"[{count}/{total}] {done_files}/{total_files} files,"
+                    f" {_format_size(done_size)}/{_format_size(total_size)}"
+                )
+                if future.result():
+                    result.succeeded.append(target)
+                    Logger.print_ok(f"{progress} | {target.label}")
+                else:
+                    result.failed.append(target)
+                    Logger.print_error(f"{progress} | {target.label} failed!")
+
+        svc.prune()
+
+        if result.failed:
+            Logger.print_warn(
+                f"{len(result.failed)} of {total} backups failed! Backups are"
+                f" located in '{svc.backup_root}'"
+            )
+        else:
+            Logger.print_ok(f"All backups created in '{svc.backup_root}'")
+        return result
+
+    def _backup(self, svc: BackupService, target: BackupTarget) -> bool:
+        if target.is_file:
+            return svc.backup_file(target.source, target.target_path)
+        path = svc.backup_directory(
+            target.source, target.backup_name, target.target_path
+        )
+        return path is not None
+
+    def _measure(self, target: BackupTarget) -> None:
+        if target.is_file:
+            target.files, target.size = 1, target.source.stat().st_size
+            return
+
+        stack = [target.source.as_posix()]
+        while stack:
+            try:
+                with os.scandir(stack.pop()) as it:
+                    for dir_entry in it:
+                        st = dir_entry.stat(follow_symlinks=False)
+                        if stat.S_ISDIR(st.st_mode):
+                            stack.append(dir_entry.path)
+                        elif stat.S_ISREG(st.st_mode):
+                            target.files += 1
+                            target.size += st.st_size
+            except OSError:
+                continue
+
+
+def _find_printer_data_dirs() -> List[Path]:
+    # fallback if no instances are found via systemd services
+    return [
+        data_dir
+        for pattern in ["printer_data", "printer_*_data"]
+        for data_dir in Path.home().glob(pattern)
+        if data_dir.is_dir()
+    ]
+
+
+def _format_size(size: int) -> str:
+    return f"{size / 1024 / 1024:.1f} MB"
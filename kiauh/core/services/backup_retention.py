@@ -0,0 +1,246 @@
+# ======================================================================= #
+#  Copyright (C) 2020 - 2026 Dominik Willner <th33xitus@gmail.com>        #
+#                                                                         #
+#  This file is part of KIAUH - Klipper Installation And Update Helper    #
+#  https://github.com/dw-0/kiauh                                          #
+#                                                                         #
+#  This file may be distributed under the terms of the GNU GPLv3 license  #
+# ======================================================================= #
+from __future__ import annotations
+
+import os
+import re
+import shutil
+import stat
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, Iterator, List, Set, Tuple
+
+from core.services.backup_checksums import CHECKSUMS_SUFFIX, get_checksums_path
+from core.services.backup_store import (
+    MANIFEST_SUFFIX,
+    STORE_DIR_NAME,
+    BackupManifest,
+    BackupStore,
+)
+
+# {backup_name}_{timestamp} followed by an optional file suffix, e.g.
+# config_20250101-120000, printer_20250101-120000.cfg or
+# klipper_20250101-120000.tar.gz
+BACKUP_NAME_RE = re.compile(r"^(?P<name>.+)_(?P<ts>\d{8}-\d{6})(?P<suffix>\..+)?$")
+TIMESTAMP_FORMAT = "%Y%m%d-%H%M%S"
+# backups are stored in the backup root or in subdirectories of it
+MAX_SCAN_DEPTH = 3
+
+
+@dataclass
+class RetentionPolicy:
+    # 0 disables the respective rule
+    keep_last: int = 0
+    max_age_days: int = 0
+    max_size_mb: int = 0
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.keep_last or self.max_age_days or self.max_size_mb)
+
+
+@dataclass
+class BackupEntry:
+    path: Path
+    name: str
+    timestamp: datetime
+    is_dir: bool
+
+    @property
+    def group(self) -> Tuple[Path, str]:
+        return self.path.parent, self.name
+
+    @property
+    def is_manifest(self) -> bool:
+        return self.path.name.endswith(MANIFEST_SUFFIX)
+
+
+@dataclass
+class PruneResult:
+    removed: List[BackupEntry] = field(default_factory=list)
+    freed_bytes: int = 0
+
+
+def scan_backups(backup_root: Path) -> List[BackupEntry]:
+    """
+    Find all backups below the backup root with a single directory scan.
+    Backups are not descended into |
+    :param backup_root: the backup root directory
+    :return: List of all backups, newest first
+    """
+    entries: List[BackupEntry] = []
+    stack: List[Tuple[str, int]] = [(backup_root.as_posix(), 1)]
+    while stack:
+        dir_path, depth = stack.pop()
+        try:
+            with os.scandir(dir_path) as it:
+                for dir_entry in it:
+                    if dir_entry.name == STORE_DIR_NAME:
+                        continue
+                    is_dir = dir_entry.is_dir(follow_symlinks=False)
+                    match = BACKUP_NAME_RE.match(dir_entry.name)
+                    if match is None:
+                        if is_dir and depth < MAX_SCAN_DEPTH:
+                            stack.append((dir_entry.path, depth + 1))
+                        continue
+                    if dir_entry.name.endswith((".part", CHECKSUMS_SUFFIX)):
+                        # unfinished archive or checksums of a backup
+                        continue
+                    try:
+                        ts = datetime.strptime(match.group("ts"), TIMESTAMP_FORMAT)
+                    except ValueError:
+                        continue
+                    name = match.group("name")
+                    entries.append(BackupEntry(Path(dir_entry.path), name, ts, is_dir))
+        except OSError:
+            continue
+
+    entries.sort(key=lambda e: e.timestamp, reverse=True)
+    return entries
+
+
+def plan_prune(
+    entries: List[BackupEntry],
+    policy: RetentionPolicy,
+    now: datetime | None = None,
+) -> List[BackupEntry]:
+    """
+    Select the backups to remove. The newest backup of each name is always
+    kept, so pruning never removes the backup that was just created |
+    :param entries: all backups, newest first
+    :param policy: the retention policy
+    :param now: optional, the current time
+    :return: List of backups to remove
+    """
+    now = now or datetime.now()
+    min_date = now - timedelta(days=policy.max_age_days)
+    max_size = policy.max_size_mb * 1024 * 1024
+    seen_groups: Dict[Tuple[Path, str], int] = {}
+    seen_inodes: Set[Tuple[int, int]] = set()
+    seen_blobs: Set[str] = set()
+    total_size = 0
+    prune: List[BackupEntry] = []
+
+    # entries are newest first, the sizes are summed up while iterating
+    for entry in entries:
+        position = seen_groups.get(entry.group, 0)
+        seen_groups[entry.group] = position + 1
+        if position == 0:
+            if max_size:
+                total_size += _get_size(entry, seen_inodes, seen_blobs)
+            continue
+
+        if policy.keep_last and position >= policy.keep_last:
+            prune.append(entry)
+            continue
+        if policy.max_age_days and entry.timestamp < min_date:
+            prune.append(entry)
+            continue
+        if max_size:
+            total_size += _get_size(entry, seen_inodes, seen_blobs)
+            if total_size > max_size:
+                prune.append(entry)
+
+    return prune
+
+
+def prune_backups(
+    backup_root: Path, policy: RetentionPolicy, store: BackupStore
+) -> PruneResult:
+    """
+    Apply the retention policy to all backups below the backup root |
+    :param backup_root: the backup root directory
+    :param policy: the retention policy
+    :param store: the content-addressed store of dedup backups
+    :return: the removed backups and the freed bytes
+    """
+    result = PruneResult()
+    if not policy.enabled or not backup_root.exists():
+        return result
+
+    entries = scan_backups(backup_root)
+    prune = plan_prune(entries, policy)
+    for entry in prune:
+        result.freed_bytes += _get_freed_size(entry)
+        if entry.is_dir:
+            shutil.rmtree(entry.path, ignore_errors=True)
+        else:
+            entry.path.unlink(missing_ok=True)
+        get_checksums_path(entry.path).unlink(missing_ok=True)
+        result.removed.append(entry)
+
+    if any(e.is_manifest for e in prune):
+        removed = {e.path for e in prune}
+        manifests: List[BackupManifest] = []
+        for entry in entries:
+            if entry.is_manifest and entry.path not in removed:
+                try:
+                    manifests.append(BackupManifest.load(entry.path))
+                except (OSError, ValueError, KeyError, TypeError):
+                    # never collect blobs a manifest may still refer to
+                    return result
+        result.freed_bytes += store.collect_garbage(manifests)
+
+    return result
+
+
+def _get_size(
+    entry: BackupEntry, seen_inodes: Set[Tuple[int, int]], seen_blobs: Set[str]
+) -> int:
+    """
+    Size of a backup that is not shared with an already counted backup.
+    Hardlinked files of snapshots and blobs of dedup backups are only counted
+    for the first backup they appear in.
+    """
+    if entry.is_dir:
+        size = 0
+        for st in _iter_file_stats(entry.path):
+            if (st.st_dev, st.st_ino) not in seen_inodes:
+                seen_inodes.add((st.st_dev, st.st_ino))
+                size += st.st_size
+        return size
+
+    try:
+        size = entry.path.stat().st_size
+        if entry.is_manifest:
+            for e in BackupManifest.load(entry.path).entries:
+                if e.sha256 is not None and e.sha256 not in seen_blobs:
+                    seen_blobs.add(e.sha256)
+                    size += e.size
+        return size
+    except (OSError, ValueError, KeyError, TypeError):
+        return 0
+
+
+def _get_freed_size(entry: BackupEntry) -> int:
+    """Size freed by removing a backup, blobs are accounted for by the store"""
+    if entry.is_dir:
+        # files hardlinked into other snapshots are not freed
+        stats = _iter_file_stats(entry.path)
+        return sum(st.st_size for st in stats if st.st_nlink == 1)
+    try:
+        return entry.path.stat().st_size
+    except OSError:
+        return 0
+
+
+def _iter_file_stats(path: Path) -> Iterator[os.stat_result]:
+    stack = [path.as_posix()]
+    while stack:
+        try:
+            with os.scandir(stack.pop()) as it:
+                for dir_entry in it:
+                    st = dir_entry.stat(follow_symlinks=False)
+                    if stat.S_ISDIR(st.st_mode):
+                        stack.append(dir_entry.path)
+                    else:
+                        yield st
+        except OSError:
+            continue
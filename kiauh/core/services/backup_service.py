@@ -8,21 +8,70 @@
 # ======================================================================= #
 from __future__ import annotations
 
+import os
+import re
 import shutil
+import stat
 from datetime import datetime
 from pathlib import Path
-from typing import List, Optional
+from typing import Callable, Dict, List, Literal, Optional, Set, Tuple
 
 from components.klipper.klipper import Klipper
 from components.moonraker.moonraker import Moonraker
 from core.logger import Logger
+from core.services.backup_archive import (
+    ARCHIVE_SUFFIXES,
+    DEFAULT_ARCHIVE_CODEC,
+    ArchiveCodec,
+    get_available_codecs,
+    write_archive,
+)
+from core.services.backup_checksums import (
+    VerifyResult,
+    copy_and_hash,
+    hash_file,
+    load_checksums,
+    save_checksums,
+    verify_backup,
+)
+from core.services.backup_index import BackupIndex, BackupRecord
+from core.services.backup_retention import (
+    BACKUP_NAME_RE,
+    PruneResult,
+    RetentionPolicy,
+    prune_backups,
+)
+from core.services.backup_store import (
+    MANIFEST_SUFFIX,
+    STORE_DIR_NAME,
+    BackupManifest,
+    BackupStore,
+    walk_directory,
+)
 from utils.instance_utils import get_instances
 
+# copy: plain copy of the directory tree
+# dedup: manifest of files in the content-addressed store
+# snapshot: copy of the directory tree, unchanged files are hardlinked
+#           to the previous backup of the same name
+# archive: compressed tar archive
+BackupMode = Literal["copy", "dedup", "snapshot", "archive"]
+BACKUP_MODES: Tuple[BackupMode, ...] = ("copy", "dedup", "snapshot", "archive")
+DEFAULT_BACKUP_MODE: BackupMode = "copy"
+
 
 class BackupService:
-    def __init__(self):
+    def __init__(self, silent: bool = False, auto_prune: bool = True) -> None:
+        """
+        :param silent: only log errors and warnings, e.g. for parallel backups
+        :param auto_prune: apply the retention policy after each backup
+        """
+        self._silent = silent
+        self._auto_prune = auto_prune
         self._backup_root = Path.home().joinpath("kiauh_backups")
         self._timestamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+        self._store = BackupStore(self._backup_root.joinpath(STORE_DIR_NAME))
+        self._index = BackupIndex(self._backup_root)
 
     @property
     def backup_root(self) -> Path:
@@ -32,6 +81,14 @@ class BackupService:
     def timestamp(self) -> str:
         return self._timestamp
 
+    @property
+    def store(self) -> BackupStore:
+        return self._store
+
+    @property
+    def index(self) -> BackupIndex:
+        return self._index
+
     ################################################
     # GENERIC BACKUP METHODS
     ################################################
@@ -44,16 +101,19 @@ class BackupService:
     ) -> bool:
         source_path = Path(source_path)
 
-        Logger.print_status(f"Creating backup of {source_path} ...")
+        self._print(Logger.print_status, f"Creating backup of {source_path} ...")
 
         if not source_path.exists():
-            Logger.print_info(
-                f"File '{source_path}' does not exist! Skipping backup..."
+            self._print(
+                Logger.print_info,
+                f"File '{source_path}' does not exist! Skipping backup...",
             )
             return False
 
         if not source_path.is_file():
-            Logger.print_info(f"'{source_path}' is not a file! Skipping backup...")
+            self._print(
+                Logger.print_info, f"'{source_path}' is not a file! Skipping backup..."
+            )
             return False
 
         try:
@@ -71,14 +131,22 @@ class BackupService:
             backup_dir.mkdir(parents=True, exist_ok=True)
             target_path = backup_dir.joinpath(filename)
             if target_path.exists():
-                Logger.print_info(f"File '{target_path}' already exists. Skipping ...")
+                self._print(
+                    Logger.print_info,
+                    f"File '{target_path}' already exists. Skipping ...",
+                )
                 return True
 
-            shutil.copy2(source_path, target_path)
+            digest = copy_and_hash(source_path, target_path)
+            save_checksums(target_path, {target_path.name: digest})
+            self._add_to_index(target_path, "file", source_path)
 
-            Logger.print_ok(
-                f"Successfully backed up '{source_path}' to '{target_path}'"
+            self._print(
+                Logger.print_ok,
+                f"Successfully backed up '{source_path}' to '{target_path}'",
             )
+            if self._auto_prune:
+                self.prune()
             return True
 
         except Exception as e:
@@ -90,19 +158,34 @@ class BackupService:
         source_path: Path,
         backup_name: str,
         target_path: Optional[Path | str] = None,
+        mode: Optional[BackupMode] = None,
     ) -> Optional[Path]:
+        """
+        Backup a directory to {backup_root}/{target_path}/{backup_name}_{timestamp} |
+        :param source_path: the directory to backup
+        :param backup_name: name of the backup, the timestamp is appended
+        :param target_path: optional, subdirectory of the backup root
+        :param mode: optional, overrides the backup mode set in the kiauh.cfg
+        :return: path of the backup directory, of the manifest in dedup mode
+                 or of the archive in archive mode
+        """
         source_path = Path(source_path)
+        mode = mode or self._get_configured_mode()
 
-        Logger.print_status(f"Creating backup of {source_path} ...")
+        self._print(Logger.print_status, f"Creating backup of {source_path} ...")
 
         if not source_path.exists():
-            Logger.print_info(
-                f"Directory '{source_path}' does not exist! Skipping backup..."
+            self._print(
+                Logger.print_info,
+                f"Directory '{source_path}' does not exist! Skipping backup...",
             )
             return None
 
         if not source_path.is_dir():
-            Logger.print_info(f"'{source_path}' is not a directory! Skipping backup...")
+            self._print(
+                Logger.print_info,
+                f"'{source_path}' is not a directory! Skipping backup...",
+            )
             return None
 
         try:
@@ -115,37 +198,325 @@ class BackupService:
             else:
                 backup_path = self._backup_root.joinpath(backup_dir_name)
 
-            if backup_path.exists():
-                Logger.print_info(f"Reusing existing backup directory '{backup_path}'")
-                for item in source_path.rglob("*"):
-                    relative_path = item.relative_to(source_path)
-                    target_item = backup_path.joinpath(relative_path)
-                    if item.is_file():
-                        if not target_item.exists():
-                            target_item.parent.mkdir(parents=True, exist_ok=True)
-                            shutil.copy2(item, target_item)
-                        else:
-                            Logger.print_info(f"File '{target_item}' already exists. Skipping...")
-                    elif item.is_dir():
-                        target_item.mkdir(parents=True, exist_ok=True)
-            else:
-                shutil.copytree(
-                    source_path,
-                    backup_path,
-                    dirs_exist_ok=True,
-                    symlinks=True,
-                    ignore_dangling_symlinks=True,
+            if mode == "dedup":
+                backup_path = self._backup_dedup(source_path, backup_path, backup_name)
+            elif mode == "archive":
+                backup_path = self._backup_archive(source_path, backup_path)
+            elif backup_path.exists():
+                self._print(
+                    Logger.print_info,
+                    f"Reusing existing backup directory '{backup_path}'",
+                )
+                digests = load_checksums(backup_path) or {}
+                copied, skipped = self._merge_directory(
+                    source_path, backup_path, digests
+                )
+                save_checksums(backup_path, digests)
+                self._print(
+                    Logger.print_info,
+                    f"Copied {copied} new files, skipped {skipped} existing files",
                 )
+            elif mode == "snapshot":
+                self._backup_snapshot(source_path, backup_path, backup_name)
+            else:
+                self._backup_copy(source_path, backup_path)
 
-            Logger.print_ok(
-                f"Successfully backed up '{source_path}' to '{backup_path}'"
+            self._print(
+                Logger.print_ok,
+                f"Successfully backed up '{source_path}' to '{backup_path}'",
             )
+            self._add_to_index(backup_path, mode, source_path)
+            if self._auto_prune:
+                self.prune()
             return backup_path
 
         except Exception as e:
             Logger.print_error(f"Failed to backup directory '{source_path}': {e}")
             return None
 
+    def prune(self) -> PruneResult:
+        """
+        Remove old backups according to the retention policy in the kiauh.cfg.
+        Runs automatically after each backup. Failing to prune is no error |
+        :return: the removed backups and the freed bytes
+        """
+        try:
+            result = prune_backups(
+                self._backup_root, self._get_retention_policy(), self._store
+            )
+        except OSError as e:
+            Logger.print_warn(f"Failed to remove old backups: {e}")
+            return PruneResult()
+
+        if result.removed:
+            self._index.remove(e.path for e in result.removed)
+            freed = result.freed_bytes / 1024 / 1024
+            self._print(
+                Logger.print_info,
+                f"Removed {len(result.removed)} old backup(s), freed {freed:.1f} MB",
+            )
+        return result
+
+    def verify(self) -> List[VerifyResult]:
+        """
+        Re-hash all backups and compare them with the checksums recorded
+        when they were created, to detect silently corrupted backups |
+        :return: List of the verify results of all backups
+        """
+        results: List[VerifyResult] = []
+        for record in self._index.list():
+            backup = self._index.resolve(record)
+            result = verify_backup(backup, self._store)
+            results.append(result)
+            if result.error is not None:
+                Logger.print_error(f"{record.path}: {result.error}")
+            elif not result.has_checksums:
+                self._print(Logger.print_info, f"{record.path}: no checksums")
+            elif result.ok:
+                self._print(Logger.print_ok, f"{record.path}: {result.checked} OK")
+            else:
+                Logger.print_error(
+                    f"{record.path}: {len(result.corrupted)} corrupted,"
+                    f" {len(result.missing)} missing of {result.checked} files"
+                )
+                for path in result.corrupted:
+                    Logger.print_error(f"  corrupted: {path}", prefix=False)
+                for path in result.missing:
+                    Logger.print_error(f"  missing: {path}", prefix=False)
+
+        damaged = [r for r in results if r.has_checksums and not r.ok]
+        if damaged:
+            Logger.print_warn(f"{len(damaged)} of {len(results)} backups are damaged!")
+        else:
+            Logger.print_ok(f"Verified {len(results)} backups, no damage found")
+        return results
+
+    def _backup_dedup(
+        self, source_path: Path, backup_path: Path, backup_name: str
+    ) -> Path:
+        backup_path.parent.mkdir(parents=True, exist_ok=True)
+        manifest_path = backup_path.with_name(f"{backup_path.name}{MANIFEST_SUFFIX}")
+
+        previous: BackupManifest | None = None
+        prev_path = self._find_latest_backup(
+            backup_path.parent, backup_name, MANIFEST_SUFFIX
+        )
+        if prev_path is not None:
+            try:
+                previous = BackupManifest.load(prev_path)
+            except (OSError, ValueError, KeyError, TypeError):
+                Logger.print_warn(f"Ignoring unreadable manifest '{prev_path}'")
+
+        manifest = self._store.snapshot(source_path, self.timestamp, previous)
+        manifest.save(manifest_path)
+        return manifest_path
+
+    def _backup_archive(self, source_path: Path, backup_path: Path) -> Path:
+        codec = self._get_configured_codec()
+        archive = backup_path.with_name(f"{backup_path.name}{ARCHIVE_SUFFIXES[codec]}")
+        archive.parent.mkdir(parents=True, exist_ok=True)
+        digests = write_archive(source_path, archive, codec)
+        save_checksums(archive, digests)
+        self._print(Logger.print_info, f"Archived {len(digests)} files ({codec})")
+        return archive
+
+    def _backup_copy(self, source_path: Path, backup_path: Path) -> None:
+        digests: Dict[str, str] = {}
+
+        def copy(src: str, dst: str) -> None:
+            rel_path = Path(src).relative_to(source_path).as_posix()
+            digests[rel_path] = copy_and_hash(src, dst)
+
+        shutil.copytree(
+            source_path,
+            backup_path,
+            dirs_exist_ok=True,
+            symlinks=True,
+            ignore_dangling_symlinks=True,
+            copy_function=copy,
+        )
+        save_checksums(backup_path, digests)
+
+    def _backup_snapshot(
+        self, source_path: Path, backup_path: Path, backup_name: str
+    ) -> None:
+        previous = self._find_latest_backup(backup_path.parent, backup_name)
+        if previous is not None and not previous.is_dir():
+            previous = None
+
+        backup_path.mkdir(parents=True)
+        linked = copied = 0
+        dirs: List[Path] = []
+        digests: Dict[str, str] = {}
+        prev_digests = load_checksums(previous) if previous is not None else None
+        prev_digests = prev_digests or {}
+        for entry in walk_directory(source_path):
+            src = source_path.joinpath(entry.path)
+            dst = backup_path.joinpath(entry.path)
+            if entry.type == "dir":
+                dst.mkdir()
+                dirs.append(src)
+            elif entry.type == "symlink":
+                os.symlink(entry.target, dst)
+            elif previous is not None and self._link_unchanged(
+                previous.joinpath(entry.path), dst, entry.size, entry.mtime_ns
+            ):
+                digests[entry.path] = prev_digests.get(entry.path) or hash_file(dst)
+                linked += 1
+            else:
+                digests[entry.path] = copy_and_hash(src, dst)
+                copied += 1
+
+        # directory times change while their content is written, so copy them last
+        for src in reversed(dirs):
+            shutil.copystat(src, backup_path.joinpath(src.relative_to(source_path)))
+        shutil.copystat(source_path, backup_path)
+        save_checksums(backup_path, digests)
+
+        if previous is not None:
+            self._print(
+                Logger.print_info,
+                f"Linked {linked} unchanged files to '{previous.name}',"
+                f" copied {copied}",
+            )
+
+    def _merge_directory(
+        self, source_path: Path, backup_path: Path, digests: Dict[str, str]
+    ) -> Tuple[int, int]:
+        """
+        Copy all files that do not exist in the backup directory yet. Each
+        directory is listed once and the cached stat results of the listing
+        are used, directories missing in the backup are not listed at all |
+        :param source_path: the directory to backup
+        :param backup_path: the existing backup directory
+        :param digests: checksums of the backup, updated with the merged files
+        :return: the amount of copied and skipped files
+        """
+        copied = skipped = 0
+        # (source dir, target dir, relative dir, target dir exists)
+        stack: List[Tuple[str, str, str, bool]] = [
+            (source_path.as_posix(), backup_path.as_posix(), "", True)
+        ]
+        while stack:
+            src_dir, dst_dir, rel_dir, dst_exists = stack.pop()
+            existing: Set[str] = set()
+            if dst_exists:
+                with os.scandir(dst_dir) as it:
+                    existing = {e.name for e in it}
+
+            with os.scandir(src_dir) as it:
+                for dir_entry in it:
+                    dst = os.path.join(dst_dir, dir_entry.name)
+                    rel_path = (
+                        f"{rel_dir}/{dir_entry.name}" if rel_dir else dir_entry.name
+                    )
+                    if dir_entry.is_symlink():
+                        if dir_entry.name in existing:
+                            skipped += 1
+                        else:
+                            os.symlink(os.readlink(dir_entry.path), dst)
+                            copied += 1
+                    elif dir_entry.is_dir():
+                        exists = dir_entry.name in existing
+                        if not exists:
+                            os.mkdir(dst)
+                        stack.append((dir_entry.path, dst, rel_path, exists))
+                    elif not dir_entry.is_file():
+                        continue
+                    elif dir_entry.name in existing:
+                        if rel_path not in digests and os.path.isfile(dst):
+                            digests[rel_path] = hash_file(dst)
+                        skipped += 1
+                    else:
+                        digests[rel_path] = copy_and_hash(dir_entry.path, dst)
+                        copied += 1
+        return copied, skipped
+
+    def _link_unchanged(self, prev: Path, dst: Path, size: int, mtime_ns: int) -> bool:
+        """Hardlink the file of the previous backup if size and mtime match"""
+        try:
+            st = prev.lstat()
+            if not (
+                stat.S_ISREG(st.st_mode)
+                and st.st_size == size
+                and st.st_mtime_ns == mtime_ns
+            ):
+                return False
+            os.link(prev, dst)
+            return True
+        except OSError:
+            # e.g. missing file, different filesystem or too many links
+            return False
+
+    def _add_to_index(self, backup_path: Path, mode: str, source_path: Path) -> None:
+        match = BACKUP_NAME_RE.match(backup_path.name)
+        if match is None or self._backup_root not in backup_path.parents:
+            # custom target names or paths are not recognized as backups
+            return
+        self._index.add(
+            BackupRecord(
+                path=backup_path.relative_to(self._backup_root).as_posix(),
+                name=match.group("name"),
+                timestamp=match.group("ts"),
+                mode=mode,
+                source=source_path.as_posix(),
+            )
+        )
+
+    def _print(self, print_fn: Callable[[str], None], msg: str) -> None:
+        if not self._silent:
+            print_fn(msg)
+
+    def _find_latest_backup(
+        self, backup_dir: Path, backup_name: str, suffix: str = ""
+    ) -> Path | None:
+        """Find the most recent backup with the given name in a directory"""
+        pattern = re.compile(
+            rf"^{re.escape(backup_name)}_\d{{8}}-\d{{6}}{re.escape(suffix)}$"
+        )
+        if not backup_dir.is_dir():
+            return None
+        # the timestamp format sorts chronologically
+        backups = sorted(p for p in backup_dir.iterdir() if pattern.match(p.name))
+        return backups[-1] if backups else None
+
+    def _get_configured_mode(self) -> BackupMode:
+        # import here, the settings depend on the backup service
+        from core.settings.kiauh_settings import KiauhSettings
+
+        mode = KiauhSettings().kiauh.backup_mode
+        if mode not in BACKUP_MODES:
+            if mode is not None:
+                Logger.print_warn(
+                    f"Unknown backup mode '{mode}'. Falling back to"
+                    f" '{DEFAULT_BACKUP_MODE}'."
+                )
+            return DEFAULT_BACKUP_MODE
+        return mode
+
+    def _get_configured_codec(self) -> ArchiveCodec:
+        from core.settings.kiauh_settings import KiauhSettings
+
+        codec = KiauhSettings().kiauh.backup_compression
+        if codec not in get_available_codecs():
+            if codec is not None:
+                Logger.print_warn(
+                    f"Compression '{codec}' not available. Falling back to"
+                    f" '{DEFAULT_ARCHIVE_CODEC}'."
+                )
+            return DEFAULT_ARCHIVE_CODEC
+        return codec
+
+    def _get_retention_policy(self) -> RetentionPolicy:
+        from core.settings.kiauh_settings import KiauhSettings
+
+        settings = KiauhSettings().kiauh
+        return RetentionPolicy(
+            keep_last=max(settings.backup_keep_last or 0, 0),
+            max_age_days=max(settings.backup_max_age_days or 0, 0),
+            max_size_mb=max(settings.backup_max_size_mb or 0, 0),
+        )
+
     ################################################
     # SPECIFIC BACKUP METHODS
     ################################################
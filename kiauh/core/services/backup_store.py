@@ -0,0 +1,264 @@
+# ======================================================================= #
+#  Copyright (C) 2020 - 2026 Dominik Willner <th33xitus@gmail.com>        #
+#                                                                         #
+#  This file is part of KIAUH - Klipper Installation And Update Helper    #
+#  https://github.com/dw-0/kiauh                                          #
+#                                                                         #
+#  This file may be distributed under the terms of the GNU GPLv3 license  #
+# ======================================================================= #
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import shutil
+import stat
+import tempfile
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, List, Literal, Set
+
+MANIFEST_SUFFIX = ".manifest.json"
+MANIFEST_VERSION = 1
+STORE_DIR_NAME = ".store"
+HASH_CHUNK_SIZE = 1024 * 1024
+
+EntryType = Literal["file", "dir", "symlink"]
+
+
+@dataclass
+class ManifestEntry:
+    path: str
+    type: EntryType
+    mode: int
+    mtime_ns: int
+    size: int = 0
+    sha256: str | None = None
+    target: str | None = None
+
+
+@dataclass
+class BackupManifest:
+    source: str
+    mode: str
+    created: str
+    entries: List[ManifestEntry] = field(default_factory=list)
+
+    @property
+    def size(self) -> int:
+        return sum(e.size for e in self.entries)
+
+    def files(self) -> Dict[str, ManifestEntry]:
+        return {e.path: e for e in self.entries if e.type == "file"}
+
+    def save(self, path: Path) -> None:
+        """
+        Write the manifest atomically, so an interrupted backup never leaves
+        a truncated manifest behind |
+        :param path: the path of the manifest file
+        :return: None
+        """
+        data = asdict(self)
+        data["version"] = MANIFEST_VERSION
+        fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(data, f, separators=(",", ":"))
+            os.replace(tmp, path)
+        except OSError:
+            Path(tmp).unlink(missing_ok=True)
+            raise
+
+    @staticmethod
+    def load(path: Path) -> BackupManifest:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        return BackupManifest(
+            source=data["source"],
+            mode=data["mode"],
+            created=data["created"],
+            entries=[ManifestEntry(**e) for e in data["entries"]],
+        )
+
+
+class BackupStore:
+    """
+    Content-addressed store for backup data. Every file is stored once under
+    its SHA-256 digest, a backup is a manifest that maps the relative paths of
+    the backed up directory to those blobs. Backing up a mostly unchanged tree
+    only costs the changed files, both in disk space and write time.
+    """
+
+    def __init__(self, root: Path) -> None:
+        self._root = root
+        self._objects = root.joinpath("objects")
+
+    @property
+    def root(self) -> Path:
+        return self._root
+
+    def blob_path(self, digest: str) -> Path:
+        return self._objects.joinpath(digest[:2], digest[2:])
+
+    def snapshot(
+        self,
+        source: Path,
+        created: str,
+        previous: BackupManifest | None = None,
+    ) -> BackupManifest:
+        """
+        Add all files of a directory to the store. Files with the same size and
+        modification time as in the previous manifest are not read again |
+        :param source: the directory to store
+        :param created: timestamp of the backup
+        :param previous: optional, manifest of the last backup of the same source
+        :return: the manifest of the backup
+        """
+        known = previous.files() if previous is not None else {}
+        manifest = BackupManifest(source.as_posix(), "dedup", created)
+
+        for entry in walk_directory(source):
+            rel_path = entry.path
+            abs_path = source.joinpath(rel_path)
+            if entry.type == "file":
+                prev = known.get(rel_path)
+                if (
+                    prev is not None
+                    and prev.size == entry.size
+                    and prev.mtime_ns == entry.mtime_ns
+                    and prev.sha256 is not None
+                    and self.blob_path(prev.sha256).exists()
+                ):
+                    entry.sha256 = prev.sha256
+                else:
+                    entry.sha256 = self.add_file(abs_path)
+            manifest.entries.append(entry)
+
+        return manifest
+
+    def add_file(self, path: Path) -> str:
+        """
+        Add a file to the store. The file is hashed and copied in one pass,
+        the copy is discarded if a blob with the same digest already exists |
+        :param path: the file to add
+        :return: the SHA-256 digest of the file
+        """
+        self._objects.mkdir(parents=True, exist_ok=True)
+        hasher = hashlib.sha256()
+        fd, tmp = tempfile.mkstemp(dir=self._objects, suffix=".tmp")
+        try:
+            with open(path, "rb") as src, os.fdopen(fd, "wb") as dst:
+                while chunk := src.read(HASH_CHUNK_SIZE):
+                    hasher.update(chunk)
+                    dst.write(chunk)
+
+            digest = hasher.hexdigest()
+            blob = self.blob_path(digest)
+            if blob.exists():
+                os.unlink(tmp)
+            else:
+                blob.parent.mkdir(exist_ok=True)
+                os.replace(tmp, blob)
+            return digest
+        except OSError:
+            Path(tmp).unlink(missing_ok=True)
+            raise
+
+    def restore(self, manifest: BackupManifest, target: Path) -> None:
+        """
+        Recreate the directory described by a manifest |
+        :param manifest: the manifest of the backup
+        :param target: the directory to restore into
+        :return: None
+        """
+        target.mkdir(parents=True, exist_ok=True)
+        dirs: List[ManifestEntry] = []
+        for entry in manifest.entries:
+            path = target.joinpath(entry.path)
+            if entry.type == "dir":
+                path.mkdir(parents=True, exist_ok=True)
+                dirs.append(entry)
+            elif entry.type == "symlink":
+                path.unlink(missing_ok=True)
+                os.symlink(entry.target, path)
+            else:
+                path.parent.mkdir(parents=True, exist_ok=True)
+                shutil.copyfile(self.blob_path(entry.sha256), path)
+                os.chmod(path, entry.mode)
+                os.utime(path, ns=(entry.mtime_ns, entry.mtime_ns))
+
+        # directory times change while their content is written, so set them last
+        for entry in reversed(dirs):
+            path = target.joinpath(entry.path)
+            os.chmod(path, entry.mode)
+            os.utime(path, ns=(entry.mtime_ns, entry.mtime_ns))
+
+    def collect_garbage(self, manifests: Iterable[BackupManifest]) -> int:
+        """
+        Remove all blobs no manifest refers to anymore |
+        :param manifests: all manifests that are still in use
+        :return: the amount of freed bytes
+        """
+        if not self._objects.exists():
+            return 0
+
+        referenced: Set[str] = {
+            e.sha256 for m in manifests for e in m.entries if e.sha256 is not None
+        }
+        freed = 0
+        for prefix in os.scandir(self._objects):
+            if not prefix.is_dir(follow_symlinks=False):
+                # leftover temporary file of an interrupted backup
+                freed += prefix.stat(follow_symlinks=False).st_size
+                os.unlink(prefix.path)
+                continue
+            for blob in os.scandir(prefix.path):
+                if f"{prefix.name}{blob.name}" not in referenced:
+                    freed += blob.stat(follow_symlinks=False).st_size
+                    os.unlink(blob.path)
+        return freed
+
+
+def walk_directory(source: Path) -> List[ManifestEntry]:
+    """
+    List all directories, files and symlinks below a directory, without
+    following symlinks. The sha256 of the file entries is not set |
+    :param source: the directory to walk
+    :return: the entries, every directory is listed before its content
+    """
+    entries: List[ManifestEntry] = []
+    stack: List[str] = [""]
+    while stack:
+        rel_dir = stack.pop()
+        with os.scandir(source.joinpath(rel_dir)) as it:
+            for dir_entry in sorted(it, key=lambda e: e.name):
+                rel_path = f"{rel_dir}/{dir_entry.name}" if rel_dir else dir_entry.name
+                st = dir_entry.stat(follow_symlinks=False)
+                if stat.S_ISLNK(st.st_mode):
+                    entries.append(
+                        ManifestEntry(
+                            rel_path,
+                            "symlink",
+                            stat.S_IMODE(st.st_mode),
+                            st.st_mtime_ns,
+                            target=os.readlink(dir_entry.path),
+                        )
+                    )
+                elif stat.S_ISDIR(st.st_mode):
+                    entries.append(
+                        ManifestEntry(
+                            rel_path, "dir", stat.S_IMODE(st.st_mode), st.st_mtime_ns
+                        )
+                    )
+                    stack.append(rel_path)
+                elif stat.S_ISREG(st.st_mode):
+                    entries.append(
+                        ManifestEntry(
+                            rel_path,
+                            "file",
+                            stat.S_IMODE(st.st_mode),
+                            st.st_mtime_ns,
+                            size=st.st_size,
+                        )
+                    )
+    return entries
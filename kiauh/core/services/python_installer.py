@@ -0,0 +1,149 @@
+# ======================================================================= #
+#  Copyright (C) 2020 - 2026 Dominik Willner <th33xitus@gmail.com>        #
+#                                                                         #
+#  This file is part of KIAUH - Klipper Installation And Update Helper    #
+#  https://github.com/dw-0/kiauh                                          #
+#                                                                         #
+#  This file may be distributed under the terms of the GNU GPLv3 license  #
+# ======================================================================= #
+from __future__ import annotations
+
+import shutil
+import time
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from pathlib import Path
+from subprocess import DEVNULL, PIPE, CompletedProcess, run
+from typing import Iterator, List
+
+from core.logger import Logger
+
+
+class PythonInstaller(ABC):
+    """
+    Backend used to create virtualenvs and install python packages into them
+    """
+
+    name: str = ""
+
+    @abstractmethod
+    def create_venv_command(
+        self, target: Path, python_binary: str, system_site_packages: bool
+    ) -> List[str]:
+        """The command that creates a virtualenv at the target"""
+
+    @abstractmethod
+    def pip_command(self, target: Path, args: List[str]) -> List[str]:
+        """The command that runs a pip subcommand for the virtualenv"""
+
+    def install(
+        self,
+        target: Path,
+        args: List[str],
+        find_links: List[str] | None = None,
+        offline: bool = False,
+    ) -> CompletedProcess:
+        """
+        Install packages into a virtualenv |
+        :param target: Path of the virtualenv
+        :param args: the install arguments, e.g. ["-r", "requirements.txt"]
+        :param find_links: additional directories to look for wheels in
+        :param offline: only install from the given directories, quietly
+        :return: the completed process, stderr is captured
+        """
+        cmd = ["install"]
+        if offline:
+            cmd.extend(self.offline_args())
+        for link in find_links or []:
+            cmd.extend(["--find-links", link])
+        return run(
+            self.pip_command(target, [*cmd, *args]),
+            stdout=DEVNULL if offline else None,
+            stderr=PIPE,
+            text=True,
+        )
+
+    def update_pip(self, target: Path) -> CompletedProcess:
+        return run(
+            self.pip_command(target, ["install", *self.quiet_args(), "-U", "pip"]),
+            stderr=PIPE,
+            text=True,
+        )
+
+    def offline_args(self) -> List[str]:
+        return ["--no-index"]
+
+    def quiet_args(self) -> List[str]:
+        return []
+
+    @contextmanager
+    def timed(self, step: str) -> Iterator[None]:
+        """Report how long a step took, if it completed without an error"""
+        start = time.monotonic()
+        yield
+        elapsed = time.monotonic() - start
+        Logger.print_info(f"{step} took {elapsed:.1f}s ({self.name})")
+
+
+class PipInstaller(PythonInstaller):
+    name = "pip"
+
+    def create_venv_command(
+        self, target: Path, python_binary: str, system_site_packages: bool
+    ) -> List[str]:
+        cmd = ["virtualenv", "-p", python_binary, target.as_posix()]
+        if system_site_packages:
+            cmd.append("--system-site-packages")
+        return cmd
+
+    def pip_command(self, target: Path, args: List[str]) -> List[str]:
+        return [target.joinpath("bin/pip").as_posix(), *args]
+
+
+class UvInstaller(PythonInstaller):
+    """
+    Uses uv, which resolves dependencies and downloads packages in parallel.
+    The virtualenvs are seeded with pip, so they stay usable without uv.
+    """
+
+    name = "uv"
+
+    def __init__(self, uv: str) -> None:
+        self._uv = uv
+
+    def create_venv_command(
+        self, target: Path, python_binary: str, system_site_packages: bool
+    ) -> List[str]:
+        cmd = [self._uv, "venv", "--seed", "--python", python_binary]
+        if system_site_packages:
+            cmd.append("--system-site-packages")
+        return [*cmd, target.as_posix()]
+
+    def pip_command(self, target: Path, args: List[str]) -> List[str]:
+        python = target.joinpath("bin/python").as_posix()
+        subcommand, *rest = args
+        # pip compiles the bytecode on install, uv only if asked to
+        extra = ["--compile-bytecode"] if subcommand == "install" else []
+        return [self._uv, "pip", subcommand, "--python", python, *extra, *rest]
+
+    def offline_args(self) -> List[str]:
+        return ["--offline", "--no-index"]
+
+    def quiet_args(self) -> List[str]:
+        # uv reports its progress on stderr
+        return ["--quiet"]
+
+
+_installer: PythonInstaller | None = None
+
+
+def get_python_installer() -> PythonInstaller:
+    """
+    Get the installer backend, uv if it is available, otherwise pip |
+    :return: the installer backend
+    """
+    global _installer
+    if _installer is None:
+        uv = shutil.which("uv")
+        _installer = UvInstaller(uv) if uv else PipInstaller()
+    return _installer
@@ -0,0 +1,317 @@
+# ======================================================================= #
+#  Copyright (C) 2020 - 2026 Dominik Willner <th33xitus@gmail.com>        #
+#                                                                         #
+#  This file is part of KIAUH - Klipper Installation And Update Helper    #
+#  https://github.com/dw-0/kiauh                                          #
+#                                                                         #
+#  This file may be distributed under the terms of the GNU GPLv3 license  #
+# ======================================================================= #
+from __future__ import annotations
+
+import os
+import shutil
+import stat
+import tarfile
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List
+
+from core.logger import Logger
+from core.services.backup_archive import extract_archive, list_archive
+from core.services.backup_checksums import hash_file
+from core.services.backup_index import BackupIndex, BackupRecord, get_backup_mode
+from core.services.backup_store import (
+    STORE_DIR_NAME,
+    BackupManifest,
+    BackupStore,
+    ManifestEntry,
+    walk_directory,
+)
+
+RESTORE_WORKERS = 4
+# tar archives only store the modification time in seconds
+NS_PER_SECOND = 1_000_000_000
+
+
+class RestoreError(Exception):
+    pass
+
+
+@dataclass
+class BackupDiff:
+    # paths relative to the backed up directory
+    changed: List[str] = field(default_factory=list)
+    missing: List[str] = field(default_factory=list)
+    # only the topmost path of extra directories is listed
+    extra: List[str] = field(default_factory=list)
+    # same content, but a different modification time
+    touched: List[str] = field(default_factory=list)
+
+    @property
+    def differing(self) -> List[str]:
+        return self.changed + self.missing
+
+    @property
+    def is_clean(self) -> bool:
+        return not (self.changed or self.missing or self.extra)
+
+
+class RestoreService:
+    """
+    Restores backups of the backup service. The backup is compared with the
+    live directory first and only the files that differ are copied back, so
+    restoring a mostly intact directory only touches the broken files.
+    """
+
+    def __init__(self, max_workers: int = RESTORE_WORKERS) -> None:
+        self._backup_root = Path.home().joinpath("kiauh_backups")
+        self._index = BackupIndex(self._backup_root)
+        self._store = BackupStore(self._backup_root.joinpath(STORE_DIR_NAME))
+        self._max_workers = max(max_workers, 1)
+
+    @property
+    def backup_root(self) -> Path:
+        return self._backup_root
+
+    def list_backups(self, name: str | None = None) -> List[BackupRecord]:
+        """
+        List the backups from the backup index |
+        :param name: optional, only list backups with this backup name
+        :return: List of backup records, newest first
+        """
+        return self._index.list(name)
+
+    def get_backup_path(self, record: BackupRecord) -> Path:
+        return self._index.resolve(record)
+
+    def load_entries(self, backup: Path) -> Dict[str, ManifestEntry]:
+        """
+        Load the entries of a backup, from the manifest of dedup backups, the
+        member list of archives or the backup directory itself |
+        :param backup: path of the backup
+        :return: Dict of the entries by their relative path
+        """
+        mode = get_backup_mode(backup, backup.is_dir())
+        try:
+            if mode == "copy":
+                entries = walk_directory(backup)
+            elif mode == "dedup":
+                entries = BackupManifest.load(backup).entries
+            elif mode == "archive":
+                entries = _get_archive_entries(list_archive(backup))
+            else:
+                raise RestoreError(f"'{backup}' is no directory backup")
+        except (OSError, ValueError, KeyError, TypeError, tarfile.TarError) as e:
+            raise RestoreError(f"Unable to read backup '{backup}': {e}")
+        return {e.path: e for e in entries}
+
+    def diff(self, backup: Path, live_dir: Path) -> BackupDiff:
+        """
+        Compare a backup with a live directory. Files differ if their type,
+        size, permissions or modification time differ. For dedup backups,
+        files that only differ in their modification time are hashed and
+        compared with the digest of the backup |
+        :param backup: path of the backup
+        :param live_dir: the directory to compare the backup with
+        :return: the changed, missing and extra paths of the live directory
+        """
+        return self._diff(self.load_entries(backup), backup, live_dir)
+
+    def restore(
+        self, backup: Path, target: Path, delete_extra: bool = False
+    ) -> BackupDiff:
+        """
+        Restore a backup into a directory. Only paths that differ from the
+        backup are restored, files are copied in parallel. Archives are
+        extracted in a single pass, as compressed streams can only be read
+        sequentially |
+        :param backup: path of the backup
+        :param target: the directory to restore into
+        :param delete_extra: remove paths that are not part of the backup
+        :return: the differences that were restored
+        """
+        Logger.print_status(f"Restoring '{backup}' to '{target}' ...")
+        entries = self.load_entries(backup)
+        diff = self._diff(entries, backup, target)
+        if not (diff.differing or diff.touched or (delete_extra and diff.extra)):
+            Logger.print_ok(f"'{target}' is identical to the backup")
+            return diff
+
+        try:
+            if delete_extra:
+                for path in diff.extra:
+                    _remove(target.joinpath(path))
+
+            target.mkdir(parents=True, exist_ok=True)
+            restore = [entries[p] for p in diff.differing]
+            for entry in restore:
+                _clear(target.joinpath(entry.path), entry)
+
+            mode = get_backup_mode(backup, backup.is_dir())
+            dirs = [e for e in restore if e.type == "dir"]
+            if mode == "archive":
+                extract_archive(backup, target, {e.path for e in restore})
+            else:
+                for entry in dirs:
+                    target.joinpath(entry.path).mkdir(parents=True, exist_ok=True)
+                files = [e for e in restore if e.type != "dir"]
+                with ThreadPoolExecutor(max_workers=self._max_workers) as executor:
+                    # list() re-raises the first error of the workers
+                    list(
+                        executor.map(
+                            lambda e: self._restore_entry(e, backup, target, mode),
+                            files,
+                        )
+                    )
+
+            for path in diff.touched:
+                entry = entries[path]
+                os.utime(target.joinpath(path), ns=(entry.mtime_ns, entry.mtime_ns))
+
+            # directory times change while their content is written, so set them last
+            for entry in reversed(dirs):
+                path = target.joinpath(entry.path)
+                os.chmod(path, entry.mode)
+                os.utime(path, ns=(entry.mtime_ns, entry.mtime_ns))
+
+        except (OSError, tarfile.TarError) as e:
+            raise RestoreError(f"Failed to restore '{backup}': {e}")
+
+        removed = len(diff.extra) if delete_extra else 0
+        Logger.print_ok(
+            f"Restored {len(diff.differing)} path(s), removed {removed} path(s)"
+        )
+        return diff
+
+    def _diff(
+        self, entries: Dict[str, ManifestEntry], backup: Path, live_dir: Path
+    ) -> BackupDiff:
+        diff = BackupDiff()
+        live: Dict[str, ManifestEntry] = {}
+        if live_dir.is_dir():
+            live = {e.path: e for e in walk_directory(live_dir)}
+
+        resolution = 1
+        if get_backup_mode(backup, backup.is_dir()) == "archive":
+            resolution = NS_PER_SECOND
+
+        to_hash: List[ManifestEntry] = []
+        for path, entry in entries.items():
+            live_entry = live.get(path)
+            if live_entry is None:
+                diff.missing.append(path)
+            elif not _is_similar(entry, live_entry):
+                diff.changed.append(path)
+            elif entry.type != "file":
+                continue
+            elif entry.mtime_ns // resolution == live_entry.mtime_ns // resolution:
+                continue
+            elif entry.sha256 is not None:
+                # touched, but possibly unchanged
+                to_hash.append(entry)
+            else:
+                diff.changed.append(path)
+
+        if to_hash:
+            with ThreadPoolExecutor(max_workers=self._max_workers) as executor:
+                digests = executor.map(
+                    lambda e: _hash_file(live_dir.joinpath(e.path)), to_hash
+                )
+                for entry, digest in zip(to_hash, digests):
+                    if digest != entry.sha256:
+                        diff.changed.append(entry.path)
+                    else:
+                        diff.touched.append(entry.path)
+
+        extra_dirs = set()
+        for path, live_entry in live.items():
+            if path in entries:
+                continue
+            parent = path.rpartition("/")[0]
+            if parent in extra_dirs:
+                if live_entry.type == "dir":
+                    extra_dirs.add(path)
+                continue
+            if live_entry.type == "dir":
+                extra_dirs.add(path)
+            diff.extra.append(path)
+
+        return diff
+
+    def _restore_entry(
+        self, entry: ManifestEntry, backup: Path, target: Path, mode: str
+    ) -> None:
+        path = target.joinpath(entry.path)
+        if entry.type == "symlink":
+            os.symlink(entry.target, path)
+        elif mode == "dedup":
+            shutil.copyfile(self._store.blob_path(entry.sha256), path)
+            os.chmod(path, entry.mode)
+            os.utime(path, ns=(entry.mtime_ns, entry.mtime_ns))
+        else:
+            shutil.copy2(backup.joinpath(entry.path), path)
+
+
+def _get_archive_entries(members: List[tarfile.TarInfo]) -> List[ManifestEntry]:
+    entries: Dict[str, ManifestEntry] = {}
+    for member in members:
+        size, target = 0, None
+        if member.isdir():
+            _type = "dir"
+        elif member.issym():
+            _type, target = "symlink", member.linkname
+        elif member.isreg():
+            _type, size = "file", member.size
+        elif member.islnk():
+            # hardlinks are stored without data, their size is the one of the target
+            linked = entries.get(member.linkname)
+            _type, size = "file", linked.size if linked is not None else 0
+        else:
+            continue
+        entries[member.name] = ManifestEntry(
+            member.name,
+            _type,
+            member.mode,
+            int(member.mtime) * NS_PER_SECOND,
+            size=size,
+            target=target,
+        )
+    return list(entries.values())
+
+
+def _is_similar(entry: ManifestEntry, live: ManifestEntry) -> bool:
+    """Compare everything but the modification time and the content"""
+    if entry.type != live.type:
+        return False
+    if entry.type == "symlink":
+        return entry.target == live.target
+    if entry.type == "dir":
+        return True
+    return entry.size == live.size and entry.mode == live.mode
+
+
+def _hash_file(path: Path) -> str | None:
+    try:
+        return hash_file(path)
+    except OSError:
+        return None
+
+
+def _clear(path: Path, entry: ManifestEntry) -> None:
+    """Remove a live path that would be replaced by a restored entry"""
+    try:
+        st = path.lstat()
+    except FileNotFoundError:
+        return
+    if entry.type == "dir" and stat.S_ISDIR(st.st_mode):
+        return
+    # files are never written through a symlink or over a hardlink
+    _remove(path)
+
+
+def _remove(path: Path) -> None:
+    if path.is_dir() and not path.is_symlink():
+        shutil.rmtree(path)
+    else:
+        path.unlink(missing_ok=True)
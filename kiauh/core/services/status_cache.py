@@ -0,0 +1,102 @@
+# ======================================================================= #
+#  Copyright (C) 2020 - 2026 Dominik Willner <th33xitus@gmail.com>        #
+#                                                                         #
+#  This file is part of KIAUH - Klipper Installation And Update Helper    #
+#  https://github.com/dw-0/kiauh                                          #
+#                                                                         #
+#  This file may be distributed under the terms of the GNU GPLv3 license  #
+# ======================================================================= #
+from __future__ import annotations
+
+import json
+import os
+import tempfile
+from dataclasses import asdict
+from json import JSONDecodeError
+from pathlib import Path
+from typing import List, Tuple
+
+from core.constants import KIAUH_CACHE_DIR
+from core.types.component_status import ComponentStatus
+
+STATUS_CACHE_DIR = KIAUH_CACHE_DIR.joinpath("status")
+
+# (path, inode, mtime in ns) - inode and mtime are None if the path does not exist
+Fingerprint = List[Tuple[str, int | None, int | None]]
+
+
+class StatusCache:
+    """
+    Persistent cache for ComponentStatus objects. Every entry is stored in its
+    own file and is only valid as long as the fingerprint of the watched paths,
+    taken before the status was computed, did not change.
+    """
+
+    def __init__(self, cache_dir: Path = STATUS_CACHE_DIR) -> None:
+        self._cache_dir = cache_dir
+
+    @property
+    def cache_dir(self) -> Path:
+        return self._cache_dir
+
+    @staticmethod
+    def fingerprint(paths: List[Path]) -> Fingerprint:
+        """
+        Stat all watched paths |
+        :param paths: List of paths to watch for changes
+        :return: Fingerprint of the paths
+        """
+        fingerprint: Fingerprint = []
+        for path in paths:
+            try:
+                st = os.stat(path)
+                fingerprint.append((path.as_posix(), st.st_ino, st.st_mtime_ns))
+            except OSError:
+                fingerprint.append((path.as_posix(), None, None))
+        return fingerprint
+
+    def get(self, key: str, fingerprint: Fingerprint) -> ComponentStatus | None:
+        """
+        Get a cached status |
+        :param key: Key of the cache entry
+        :param fingerprint: Current fingerprint of the watched paths
+        :return: The cached ComponentStatus or None if missing or outdated
+        """
+        try:
+            with open(self._get_entry_path(key), "r", encoding="utf-8") as f:
+                entry = json.load(f)
+
+            stored = [tuple(item) for item in entry["fingerprint"]]
+            if stored != [tuple(item) for item in fingerprint]:
+                return None
+
+            return ComponentStatus(**entry["status"])
+        except (OSError, JSONDecodeError, KeyError, TypeError):
+            return None
+
+    def set(self, key: str, fingerprint: Fingerprint, status: ComponentStatus) -> None:
+        """
+        Store a status. Failing to write the cache is not considered an error |
+        :param key: Key of the cache entry
+        :param fingerprint: Fingerprint taken before the status was computed
+        :param status: The ComponentStatus to store
+        :return: None
+        """
+        entry = {"fingerprint": fingerprint, "status": asdict(status)}
+        try:
+            self._cache_dir.mkdir(parents=True, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=self._cache_dir, suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(entry, f)
+            os.replace(tmp, self._get_entry_path(key))
+        except OSError:
+            return
+
+    def invalidate(self, key: str) -> None:
+        try:
+            self._get_entry_path(key).unlink()
+        except OSError:
+            return
+
+    def _get_entry_path(self, key: str) -> Path:
+        return self._cache_dir.joinpath(f"{key}.json")
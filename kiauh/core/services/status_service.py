@@ -0,0 +1,113 @@
+# ======================================================================= #
+#  Copyright (C) 2020 - 2026 Dominik Willner <th33xitus@gmail.com>        #
+#                                                                         #
+#  This file is part of KIAUH - Klipper Installation And Update Helper    #
+#  https://github.com/dw-0/kiauh                                          #
+#                                                                         #
+#  This file may be distributed under the terms of the GNU GPLv3 license  #
+# ======================================================================= #
+from __future__ import annotations
+
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Tuple
+
+from core.logger import Logger
+from core.types.component_status import ComponentStatus
+
+# default time in seconds a single status probe may take
+PROBE_TIMEOUT: float = 10.0
+
+
+@dataclass
+class StatusProbe:
+    """
+    Describes a single component status lookup.
+    :param name: Name the result will be stored under
+    :param status_fn: Function returning the ComponentStatus of the component
+    :param args: Positional arguments passed to the status function
+    """
+
+    name: str
+    status_fn: Callable[..., ComponentStatus]
+    args: Tuple[Any, ...] = field(default_factory=tuple)
+
+    def run(self) -> ComponentStatus:
+        return self.status_fn(*self.args)
+
+
+class StatusService:
+    """
+    Runs independent component status probes concurrently. Every probe
+    gets its own timeout, so a single slow or offline remote does not block
+    the others. Probes that fail or time out are logged and reported with
+    the status "Unknown" or "Timed out".
+    """
+
+    def __init__(self, timeout: float = PROBE_TIMEOUT) -> None:
+        self._timeout = timeout
+
+    @property
+    def timeout(self) -> float:
+        return self._timeout
+
+    def collect(
+        self,
+        probes: List[StatusProbe],
+        on_result: Callable[[str, ComponentStatus], None] | None = None,
+    ) -> Dict[str, ComponentStatus]:
+        """
+        Run all probes at the same time and collect their results |
+        :param probes: List of probes to run
+        :param on_result: Optional callback, called for every probe as soon as
+                          it completes
+        :return: Dictionary of probe name and ComponentStatus of all probes
+        """
+        results: Dict[str, ComponentStatus] = {}
+        if not probes:
+            return results
+
+        def report(name: str, status: ComponentStatus) -> None:
+            results[name] = status
+            if on_result is not None:
+                on_result(name, status)
+
+        executor = ThreadPoolExecutor(max_workers=len(probes))
+        try:
+            # every probe gets its own worker, so all of them start right away
+            # and the deadline of each probe equals the deadline of the batch
+            deadline = time.monotonic() + self._timeout
+            pending: Dict[Future, StatusProbe] = {
+                executor.submit(probe.run): probe for probe in probes
+            }
+
+            while pending:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+
+                done, _ = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+                for future in done:
+                    probe = pending.pop(future)
+                    error = future.exception()
+                    if error is not None:
+                        Logger.print_error(
+                            f"Unable to get the status of {probe.name}: {error}"
+                        )
+                        report(probe.name, ComponentStatus(status=3, instances=0))
+                        continue
+
+                    report(probe.name, future.result())
+
+            for probe in pending.values():
+                Logger.print_warn(
+                    f"Getting the status of {probe.name} timed out "
+                    f"after {self._timeout:.0f}s"
+                )
+                report(probe.name, ComponentStatus(status=4, instances=0))
+        finally:
+            # do not wait for probes that exceeded their timeout
+            executor.shutdown(wait=False)
+
+        return results
@@ -0,0 +1,206 @@
+# ======================================================================= #
+#  Copyright (C) 2020 - 2026 Dominik Willner <th33xitus@gmail.com>        #
+#                                                                         #
+#  This file is part of KIAUH - Klipper Installation And Update Helper    #
+#  https://github.com/dw-0/kiauh                                          #
+#                                                                         #
+#  This file may be distributed under the terms of the GNU GPLv3 license  #
+# ======================================================================= #
+from __future__ import annotations
+
+import os
+import socket
+from pathlib import Path
+from subprocess import DEVNULL, PIPE, CalledProcessError, run
+from typing import Dict, List, Tuple
+from urllib.parse import urlparse
+
+from core.constants import KIAUH_DATA_DIR
+from core.logger import Logger
+from core.services.python_installer import PythonInstaller, get_python_installer
+
+WHEELHOUSE_DIR = KIAUH_DATA_DIR.joinpath("wheelhouse")
+DEFAULT_INDEX_URL = "https://pypi.org/simple"
+INDEX_PROBE_TIMEOUT = 5
+
+# prints e.g. "cpython-311-linux-aarch64", wheels built by one interpreter
+# can only be installed by the same interpreter on the same platform
+TAG_SCRIPT = (
+    "import sys, sysconfig;"
+    "print(sys.implementation.cache_tag + '-' + sysconfig.get_platform())"
+)
+
+# interpreter path -> tag, the interpreter of a venv rarely changes
+_tags: Dict[str, str] = {}
+
+
+class Wheelhouse:
+    """
+    Local directory of built wheels, shared by all virtualenvs KIAUH creates.
+    Wheels are stored per interpreter and platform tag and are filled by the
+    explicit prebuild step. Installs prefer its wheels over building them
+    again, and fall back to the wheelhouse only, which needs no network and
+    no compiler, if the package index is unreachable.
+    """
+
+    def __init__(self, root: Path = WHEELHOUSE_DIR) -> None:
+        self._root = root
+
+    @property
+    def root(self) -> Path:
+        return self._root
+
+    def get_tag(self, venv: Path) -> str | None:
+        """
+        Get the interpreter and platform tag of a virtualenv |
+        :param venv: Path of the virtualenv
+        :return: the tag or None if the interpreter could not be run
+        """
+        python = venv.joinpath("bin/python").as_posix()
+        if python not in _tags:
+            try:
+                result = run(
+                    [python, "-c", TAG_SCRIPT],
+                    stdout=PIPE,
+                    stderr=DEVNULL,
+                    text=True,
+                    check=True,
+                )
+                _tags[python] = result.stdout.strip().replace(".", "_")
+            except (OSError, CalledProcessError):
+                return None
+        return _tags[python]
+
+    def get_dir(self, venv: Path) -> Path | None:
+        tag = self.get_tag(venv)
+        return self._root.joinpath(tag) if tag else None
+
+    def install(
+        self, venv: Path, args: List[str], installer: PythonInstaller | None = None
+    ) -> bool:
+        """
+        Install from the wheelhouse only, without accessing the network |
+        :param venv: Path of the virtualenv
+        :param args: the pip install arguments, e.g. ["-r", "requirements.txt"]
+        :param installer: the installer backend, the default backend if None
+        :return: True if all packages could be installed from the wheelhouse
+        """
+        wheel_dir = self.get_dir(venv)
+        if wheel_dir is None or not wheel_dir.is_dir():
+            return False
+
+        installer = installer or get_python_installer()
+        result = installer.install(
+            venv, args, find_links=[wheel_dir.as_posix()], offline=True
+        )
+        return result.returncode == 0
+
+    def build(self, venv: Path, args: List[str], verbose: bool = False) -> bool:
+        """
+        Add the wheels of the given requirements to the wheelhouse. Wheels
+        already in the wheelhouse or in the pip cache are not built again |
+        :param venv: Path of the virtualenv
+        :param args: the pip arguments, e.g. ["-r", "requirements.txt"]
+        :param verbose: print the pip errors if building fails
+        :return: True if all wheels could be built
+        """
+        wheel_dir = self.get_dir(venv)
+        if wheel_dir is None:
+            return False
+
+        wheel_dir.mkdir(parents=True, exist_ok=True)
+        pip = venv.joinpath("bin/pip").as_posix()
+        cmd = [pip, "wheel", "--find-links", wheel_dir.as_posix(), "-w"]
+        result = run(
+            [*cmd, wheel_dir.as_posix(), *args],
+            stdout=DEVNULL,
+            stderr=PIPE,
+            text=True,
+        )
+        if result.returncode != 0:
+            if verbose:
+                Logger.print_error(f"{result.stderr}", False)
+            return False
+        return True
+
+    def find_links(self, venv: Path) -> List[str]:
+        """Directories that make the installer prefer the wheelhouse wheels"""
+        wheel_dir = self.get_dir(venv)
+        if wheel_dir is None or not wheel_dir.is_dir():
+            return []
+        return [wheel_dir.as_posix()]
+
+
+def is_index_reachable(timeout: float = INDEX_PROBE_TIMEOUT) -> bool:
+    """
+    Check if a connection to the package index can be opened |
+    :param timeout: seconds to wait for the connection
+    :return: True if the index is reachable or a local directory
+    """
+    index_url = os.environ.get("PIP_INDEX_URL") or os.environ.get("UV_INDEX_URL")
+    url = urlparse(index_url or DEFAULT_INDEX_URL)
+    if url.scheme not in ("http", "https") or not url.hostname:
+        return True
+    port = url.port or (443 if url.scheme == "https" else 80)
+    try:
+        socket.create_connection((url.hostname, port), timeout=timeout).close()
+        return True
+    except OSError:
+        return False
+
+
+def get_prebuild_targets() -> List[Tuple[str, Path, List[Path]]]:
+    """
+    Collect the virtualenvs of the installed components and their
+    requirements files |
+    :return: List of the component name, the virtualenv and requirements files
+    """
+    # import here, the components depend on the sys_utils using the wheelhouse
+    from components.klipper import KLIPPER_ENV_DIR, KLIPPER_REQ_FILE
+    from components.klipperscreen import (
+        KLIPPERSCREEN_ENV_DIR,
+        KLIPPERSCREEN_REQ_FILE,
+    )
+    from components.moonraker import (
+        MOONRAKER_ENV_DIR,
+        MOONRAKER_REQ_FILE,
+        MOONRAKER_SPEEDUPS_REQ_FILE,
+    )
+
+    targets = [
+        ("Klipper", KLIPPER_ENV_DIR, [KLIPPER_REQ_FILE]),
+        (
+            "Moonraker",
+            MOONRAKER_ENV_DIR,
+            [MOONRAKER_REQ_FILE, MOONRAKER_SPEEDUPS_REQ_FILE],
+        ),
+        ("KlipperScreen", KLIPPERSCREEN_ENV_DIR, [KLIPPERSCREEN_REQ_FILE]),
+    ]
+    return [
+        (name, venv, [f for f in req_files if f.is_file()])
+        for name, venv, req_files in targets
+        if venv.joinpath("bin/pip").exists() and any(f.is_file() for f in req_files)
+    ]
+
+
+def prebuild_wheels() -> None:
+    """
+    Build the wheels of all installed components into the wheelhouse, so
+    their virtualenvs can be rebuilt without network access or compiling |
+    :return: None
+    """
+    targets = get_prebuild_targets()
+    if not targets:
+        Logger.print_info("No Python virtualenvs found to prebuild wheels for.")
+        return
+
+    wheelhouse = Wheelhouse()
+    for name, venv, req_files in targets:
+        Logger.print_status(f"Prebuilding wheels for {name} ...")
+        args = [arg for f in req_files for arg in ("-r", f.as_posix())]
+        if wheelhouse.build(venv, args, verbose=True):
+            Logger.print_ok(
+                f"Wheels for {name} are ready in '{wheelhouse.get_dir(venv)}'"
+            )
+        else:
+            Logger.print_error(f"Prebuilding wheels for {name} failed!")
@@ -41,6 +41,12 @@ class InvalidValueError(Exception):
 @dataclass
 class AppSettings:
     backup_before_update: bool | None = field(default=None)
+    http_cache_ttl: int | None = field(default=None)
+    backup_mode: str | None = field(default=None)
+    backup_compression: str | None = field(default=None)
+    backup_keep_last: int | None = field(default=None)
+    backup_max_age_days: int | None = field(default=None)
+    backup_max_size_mb: int | None = field(default=None)
 
 
 @dataclass
@@ -157,6 +163,48 @@ class KiauhSettings:
             self.config.getboolean,
             False,
         )
+        self.kiauh.http_cache_ttl = self.__read_from_cfg(
+            "kiauh",
+            "http_cache_ttl",
+            self.config.getint,
+            300,
+            True,
+        )
+        self.kiauh.backup_mode = self.__read_from_cfg(
+            "kiauh",
+            "backup_mode",
+            self.config.getval,
+            "copy",
+            True,
+        )
+        self.kiauh.backup_compression = self.__read_from_cfg(
+            "kiauh",
+            "backup_compression",
+            self.config.getval,
+            "gzip",
+            True,
+        )
+        self.kiauh.backup_keep_last = self.__read_from_cfg(
+            "kiauh",
+            "backup_keep_last",
+            self.config.getint,
+            0,
+            True,
+        )
+        self.kiauh.backup_max_age_days = self.__read_from_cfg(
+            "kiauh",
+            "backup_max_age_days",
+            self.config.getint,
+            0,
+            True,
+        )
+        self.kiauh.backup_max_size_mb = self.__read_from_cfg(
+            "kiauh",
+            "backup_max_size_mb",
+            self.config.getint,
+            0,
+            True,
+        )
 
         # parse Klipper options
         self.klipper.use_python_binary = self.__read_from_cfg(
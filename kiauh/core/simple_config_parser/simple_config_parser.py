@@ -12,7 +12,7 @@ import re
 from dataclasses import dataclass, field
 from enum import Enum
 from pathlib import Path
-from typing import Any, Callable, Dict, List, Set, Union
+from typing import Any, Callable, Dict, List, Set, Tuple, Union
 
 # definition of section line:
 #  - the line MUST start with an opening square bracket - it is the first section marker
@@ -177,6 +177,7 @@ class CommentLine:
 
 
 SectionItem = Union[Option, MultiLineOption, Gcode, BlankLine, CommentLine]
+OptionItem = Union[Option, MultiLineOption]
 
 
 @dataclass
@@ -198,6 +199,11 @@ class SimpleConfigParser:
         self._header: List[str] = []
         self._save_config_block: List[str] = []
         self._config: List[Section] = []
+        # lookup indices, kept in sync with self._config by all mutating methods
+        # section name -> all sections of that name in order of appearance
+        self._sect_index: Dict[str, List[Section]] = {}
+        # section name -> option name -> first option of that name and its section
+        self._opt_index: Dict[str, Dict[str, Tuple[Section, OptionItem]]] = {}
         self._curr_sect: Union[Section, None] = None
         self._curr_ml_opt: Union[MultiLineOption, None] = None
         self._curr_gcode: Union[Gcode, None] = None
@@ -236,45 +242,55 @@ class SimpleConfigParser:
 
     def _parse_line(self, line: str) -> None:
         """Parses a line and determines its type"""
-        if self._curr_sect is None and not self._match_section(line):
+        # dispatch on the first character, so most lines are classified with a
+        # single regex match or a plain string check, and reuse the match object
+        first_char = line[:1]
+
+        if first_char == "[":
+            match = SECTION_RE.match(line)
+            if match is not None:
+                self._reset_special_items()
+
+                sect = Section(name=match.group(1), raw=line)
+                self._curr_sect = sect
+                self._config.append(sect)
+                self._index_section(sect)
+                return
+
+        if self._curr_sect is None:
             # we are at the beginning of the file, so we consider the part
             # up to the first section as the file header and store it separately
             self._header.append(line)
             return
 
-        if self._match_section(line):
-            self._reset_special_items()
-
-            sect_name: str = SECTION_RE.match(line).group(1)
-            sect = Section(name=sect_name, raw=line)
-            self._curr_sect = sect
-            self._config.append(sect)
-            return
-
-        if self._match_option(line):
-            self._reset_special_items()
-
-            name: str = OPTION_RE.match(line).group(1)
-            val: str = OPTION_RE.match(line).group(2)
-            opt = Option(
-                name=name,
-                raw=line,
-                value=val,
-            )
-            self._curr_sect.items.append(opt)
-            return
+        # options and option blocks must start with a non-whitespace character
+        # that is neither a comment marker nor a separator
+        if first_char and first_char not in ";#:=" and not first_char.isspace():
+            match = OPTION_RE.match(line)
+            if match is not None:
+                self._reset_special_items()
+
+                opt = Option(
+                    name=match.group(1),
+                    raw=line,
+                    value=match.group(2),
+                )
+                self._curr_sect.items.append(opt)
+                self._index_option(self._curr_sect, opt)
+                return
 
-        if self._match_options_block_start(line):
-            self._reset_special_items()
+            match = OPTIONS_BLOCK_START_RE.match(line)
+            if match is not None:
+                self._reset_special_items()
 
-            name: str = OPTIONS_BLOCK_START_RE.match(line).group(1)
-            ml_opt = MultiLineOption(
-                name=name,
-                raw=line,
-            )
-            self._curr_ml_opt = ml_opt
-            self._curr_sect.items.append(ml_opt)
-            return
+                ml_opt = MultiLineOption(
+                    name=match.group(1),
+                    raw=line,
+                )
+                self._curr_ml_opt = ml_opt
+                self._curr_sect.items.append(ml_opt)
+                self._index_option(self._curr_sect, ml_opt)
+                return
 
         if self._curr_ml_opt is not None:
             # we are in an option block, so we consecutively add values
@@ -295,7 +311,7 @@ class SimpleConfigParser:
             self._curr_ml_opt.values.append(ml_value)
             return
 
-        if self._match_gcode_block_start(line):
+        if "gcode" in line and GCODE_BLOCK_START_RE.match(line) is not None:
             self._curr_gcode = Gcode(
                 name="gcode",
                 raw=line,
@@ -309,22 +325,19 @@ class SimpleConfigParser:
             self._curr_gcode.gcode.append(line)
             return
 
-        if self._match_save_config_start(line):
-            self._reset_special_items()
-            self._save_config_block.append(line)
-            return
-
-        if self._match_save_config_content(line):
+        # both, the save config start and content lines, start with "#*#"
+        if line.startswith("#*#") and SAVE_CONFIG_CONTENT_RE.match(line) is not None:
             self._reset_special_items()
             self._save_config_block.append(line)
             return
 
-        if self._match_empty_line(line):
+        stripped = line.lstrip()
+        if not stripped:
             self._reset_special_items()
             self._curr_sect.items.append(BlankLine(raw=line))
             return
 
-        if self._match_line_comment(line):
+        if stripped.startswith(("#", ";")):
             self._reset_special_items()
             self._curr_sect.items.append(CommentLine(raw=line))
             return
@@ -338,9 +351,21 @@ class SimpleConfigParser:
         """Return the indentation level of a line"""
         return len(line) - len(line.lstrip())
 
+    def _index_section(self, sect: Section) -> None:
+        """Register a section that was appended to the config"""
+        self._sect_index.setdefault(sect.name, []).append(sect)
+
+    def _index_option(self, sect: Section, opt: OptionItem) -> None:
+        """Register an option, the first option with a given name wins"""
+        options = self._opt_index.setdefault(sect.name, {})
+        if opt.name not in options:
+            options[opt.name] = (sect, opt)
+
     def read_file(self, file: Path) -> None:
         """Read and parse a config file"""
         self._config = []
+        self._sect_index = {}
+        self._opt_index = {}
         with open(file, "r", encoding="utf-8") as file:
             for line in file:
                 self._parse_line(line)
@@ -375,20 +400,21 @@ class SimpleConfigParser:
 
     def get_sections(self) -> Set[str]:
         """Return a set of all section names"""
-        return {s.name for s in self._config} if self._config else set()
+        return set(self._sect_index)
 
     def has_section(self, section: str) -> bool:
         """Check if a section exists"""
-        return section in self.get_sections()
+        return section in self._sect_index
 
     def add_section(self, section: str) -> Section:
         """Add a new section to the config"""
-        if section in self.get_sections():
+        if section in self._sect_index:
             raise DuplicateSectionError(section)
 
         if not self._config:
             new_sect = Section(name=section, raw=f"[{section}]\n")
             self._config.append(new_sect)
+            self._index_section(new_sect)
             return new_sect
 
         last_sect: Section = self._config[-1]
@@ -399,6 +425,7 @@ class SimpleConfigParser:
 
         new_sect = Section(name=section, raw=f"[{section}]\n")
         self._config.append(new_sect)
+        self._index_section(new_sect)
         return new_sect
 
     def remove_section(self, section: str) -> None:
@@ -406,20 +433,18 @@ class SimpleConfigParser:
 
         This will remove ALL occurences of sections with the given name.
         """
+        if self._sect_index.pop(section, None) is None:
+            return
+        self._opt_index.pop(section, None)
         self._config = [s for s in self._config if s.name != section]
 
     def get_options(self, section: str) -> Set[str]:
         """Return a set of all option names for a given section"""
-        sections: List[Section] = [s for s in self._config if s.name == section]
-        all_items: List[SectionItem] = [
-            item for section in sections for item in section.items
-        ]
-
-        return {o.name for o in all_items if isinstance(o, (Option, MultiLineOption))}
+        return set(self._opt_index.get(section, {}))
 
     def has_option(self, section: str, option: str) -> bool:
         """Check if an option exists in a section"""
-        return self.has_section(section) and option in self.get_options(section)
+        return option in self._opt_index.get(section, {})
 
     def set_option(self, section: str, option: str, value: str | List[str]) -> None:
         """
@@ -432,7 +457,7 @@ class SimpleConfigParser:
         section: Section = (
             self.add_section(section)
             if not self.has_section(section)
-            else next(s for s in self._config if s.name == section)
+            else self._sect_index[section][0]
         )
 
         opt = self._find_option_by_name(option, section=section)
@@ -464,6 +489,9 @@ class SimpleConfigParser:
                     last_opt_idx = idx
             # insert the new option after the last existing option
             section.items.insert(last_opt_idx + 1, _opt)
+            # the first section of a name is searched first, so the new
+            # option shadows one that only exists in a later section
+            self._opt_index.setdefault(section.name, {})[option] = (section, _opt)
 
         elif opt and isinstance(opt, Option) and isinstance(value, str):
             curr_val = opt.value
@@ -488,7 +516,7 @@ class SimpleConfigParser:
         self, sect_name: str
     ) -> Union[None, Section, List[Section]]:
         """Find a section by name"""
-        _sects = [s for s in self._config if s.name == sect_name]
+        _sects = self._sect_index.get(sect_name, [])
         if len(_sects) > 1:
             return _sects
         elif len(_sects) == 1:
@@ -506,6 +534,9 @@ class SimpleConfigParser:
 
         # if a single section is provided, search its items for the option
         if section is not None:
+            indexed = self._opt_index.get(section.name, {}).get(opt_name)
+            if indexed is not None and indexed[0] is section:
+                return indexed[1]
             for item in section.items:
                 if (
                     isinstance(item, (Option, MultiLineOption))
@@ -534,10 +565,11 @@ class SimpleConfigParser:
         This will remove the option from ALL occurences of sections with the given name.
         Other non-option items (comments, blank lines, etc.) are preserved.
         """
-        sections: List[Section] = [s for s in self._config if s.name == section]
+        sections: List[Section] = self._sect_index.get(section, [])
         if not sections:
             return
 
+        self._opt_index.get(section, {}).pop(option, None)
         for sect in sections:
             sect.items = [
                 item
@@ -551,16 +583,12 @@ class SimpleConfigParser:
         self, section: str, option: str
     ) -> Union[Option, MultiLineOption, None]:
         """Internal helper to resolve an option or multi-line option."""
-        if section not in self.get_sections():
+        if section not in self._sect_index:
             raise NoSectionError(section)
-        if option not in self.get_options(section):
+        indexed = self._opt_index.get(section, {}).get(option)
+        if indexed is None:
             raise NoOptionError(option, section)
-        sects: List[Section] = [s for s in self._config if s.name == section]
-        return (
-            self._find_option_by_name(option, sections=sects)
-            if len(sects) > 1
-            else self._find_option_by_name(option, section=sects[0])
-        )
+        return indexed[1]
 
     def getval(self, section: str, option: str, fallback: str | _UNSET = _UNSET) -> str:
         """
@@ -0,0 +1,147 @@
+# ======================================================================= #
+#  Copyright (C) 2025 Dominik Willner <th33xitus@gmail.com>               #
+#                                                                         #
+#  https://github.com/dw-0/simple-config-parser                           #
+#                                                                         #
+#  This file may be distributed under the terms of the GNU GPLv3 license  #
+# ======================================================================= #
+"""
+Parse-time benchmark for the SimpleConfigParser.
+
+Parses every config file of the test assets and synthetic configs of the
+given sizes and reports the best time out of several rounds. Results can be
+stored as a baseline and later runs compared against it, the exit code is 1
+if any case got slower than the allowed tolerance.
+
+Run from the 'kiauh' directory:
+    python -m core.simple_config_parser.tests.benchmark.bench_parse
+    python -m core.simple_config_parser.tests.benchmark.bench_parse --save base.json
+    python -m core.simple_config_parser.tests.benchmark.bench_parse --compare base.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List
+
+from core.simple_config_parser.simple_config_parser import SimpleConfigParser
+
+ASSETS_DIR = Path(__file__).parent.parent.joinpath("assets")
+SYNTHETIC_SIZES = [50_000]
+
+
+def generate_config(lines: int) -> str:
+    """
+    Generate a Klipper style config, mixing all line types the parser knows
+    about, with roughly the given amount of lines
+    """
+    content: List[str] = ["# generated config header\n", "\n"]
+    i = 0
+    while len(content) < lines:
+        content.extend(
+            [
+                f"[stepper_{i}]  # section comment\n",
+                f"step_pin: PF{i % 16}\n",
+                f"dir_pin = !PF{i % 16}  ; inline comment\n",
+                f"rotation_distance: {i % 40 + 0.5}\n",
+                "# a comment line\n",
+                "    ; an indented comment line\n",
+                "\n",
+                "multi_line_option:\n",
+                f"    value_{i}\n",
+                "    second value  # value comment\n",
+                "\n",
+                f"[gcode_macro MACRO_{i}]\n",
+                "description: some macro\n",
+                "gcode:\n",
+                "    {% set speed = params.SPEED|default(100)|int %}\n",
+                "    G28\n",
+                f"    G1 X{i % 200} F{{speed}}\n",
+                "\n",
+            ]
+        )
+        i += 1
+    content.extend(
+        [
+            "[probe]\n",
+            "pin: PB7\n",
+            "\n",
+            "#*# <---------------------- SAVE_CONFIG ---------------------->\n",
+            "#*# DO NOT EDIT THIS BLOCK OR BELOW. The contents are auto-generated.\n",
+            "#*#\n",
+            "#*# [probe]\n",
+            "#*# z_offset = 1.234\n",
+        ]
+    )
+    return "".join(content)
+
+
+def time_parse(path: Path, rounds: int) -> float:
+    """Return the best time in seconds to parse the file out of all rounds"""
+    best = float("inf")
+    for _ in range(rounds):
+        parser = SimpleConfigParser()
+        start = time.perf_counter()
+        parser.read_file(path)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run(rounds: int, sizes: List[int]) -> Dict[str, float]:
+    results: Dict[str, float] = {}
+    for path in sorted(ASSETS_DIR.rglob("*.cfg")):
+        name = path.relative_to(ASSETS_DIR).as_posix()
+        results[name] = time_parse(path, rounds)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in sizes:
+            path = Path(tmp).joinpath(f"synthetic_{size}.cfg")
+            path.write_text(generate_config(size), encoding="utf-8")
+            results[f"synthetic_{size}"] = time_parse(path, rounds)
+
+    return results
+
+
+def main() -> int:
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    arg_parser.add_argument("--rounds", type=int, default=5)
+    arg_parser.add_argument("--sizes", type=int, nargs="*", default=SYNTHETIC_SIZES)
+    arg_parser.add_argument("--save", type=Path, help="store results as baseline")
+    arg_parser.add_argument("--compare", type=Path, help="compare against baseline")
+    arg_parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.2,
+        help="allowed relative slowdown compared to the baseline",
+    )
+    args = arg_parser.parse_args()
+
+    results = run(args.rounds, args.sizes)
+    baseline: Dict[str, float] = {}
+    if args.compare is not None:
+        baseline = json.loads(args.compare.read_text(encoding="utf-8"))
+
+    regressions = 0
+    for name, seconds in results.items():
+        line = f"{name:<45} {seconds * 1000:10.3f} ms"
+        if name in baseline:
+            ratio = seconds / baseline[name]
+            line += f"  ({ratio:.2f}x baseline)"
+            if ratio > 1 + args.tolerance:
+                line += "  REGRESSION"
+                regressions += 1
+        print(line)
+
+    if args.save is not None:
+        args.save.write_text(json.dumps(results, indent=2), encoding="utf-8")
+
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
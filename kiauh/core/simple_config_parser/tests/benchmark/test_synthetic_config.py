@@ -0,0 +1,52 @@
+# ======================================================================= #
+#  Copyright (C) 2025 Dominik Willner <th33xitus@gmail.com>               #
+#                                                                         #
+#  https://github.com/dw-0/simple-config-parser                           #
+#                                                                         #
+#  This file may be distributed under the terms of the GNU GPLv3 license  #
+# ======================================================================= #
+from core.simple_config_parser.simple_config_parser import (
+    Gcode,
+    MultiLineOption,
+    Option,
+    SimpleConfigParser,
+)
+from core.simple_config_parser.tests.benchmark.bench_parse import generate_config
+
+
+def test_synthetic_config_roundtrip(tmp_path):
+    content = generate_config(50_000)
+    src = tmp_path / "synthetic.cfg"
+    out = tmp_path / "out.cfg"
+    src.write_text(content, encoding="utf-8")
+
+    parser = SimpleConfigParser()
+    parser.read_file(src)
+    parser.write_file(out)
+
+    assert out.read_text(encoding="utf-8") == content
+
+
+def test_synthetic_config_line_types(tmp_path):
+    src = tmp_path / "synthetic.cfg"
+    src.write_text(generate_config(100), encoding="utf-8")
+
+    parser = SimpleConfigParser()
+    parser.read_file(src)
+
+    assert parser._header == ["# generated config header\n", "\n"]
+    assert len(parser._save_config_block) == 5
+    assert parser.getval("stepper_0", "step_pin") == "PF0"
+    assert parser.getval("stepper_0", "dir_pin") == "!PF0"
+    # the blank line following an option block is part of its values
+    assert parser.getvals("stepper_0", "multi_line_option") == [
+        "value_0",
+        "second value",
+        "",
+    ]
+
+    items = parser._config[1].items
+    assert isinstance(items[0], Option)
+    assert isinstance(items[1], Gcode)
+    assert len(items[1].gcode) == 4
+    assert any(isinstance(i, MultiLineOption) for i in parser._config[0].items)
@@ -11,12 +11,15 @@ from __future__ import annotations
 from dataclasses import dataclass
 from typing import Dict, Literal
 
-StatusText = Literal["Installed", "Not installed", "Incomplete"]
-StatusCode = Literal[0, 1, 2]
+StatusText = Literal["Installed", "Not installed", "Incomplete", "Unknown", "Timed out"]
+StatusCode = Literal[0, 1, 2, 3, 4]
 StatusMap: Dict[StatusCode, StatusText] = {
     0: "Not installed",
     1: "Incomplete",
     2: "Installed",
+    # the status lookup failed or did not finish in time
+    3: "Unknown",
+    4: "Timed out",
 }
 
 
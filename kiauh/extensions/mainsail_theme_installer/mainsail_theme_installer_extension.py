@@ -11,7 +11,6 @@ from __future__ import annotations
 import csv
 import shutil
 import textwrap
-import urllib.request
 from dataclasses import dataclass
 from typing import Any, Dict, List, Type
 
@@ -26,6 +25,7 @@ from core.menus.base_menu import BaseMenu
 from core.types.color import Color
 from extensions.base_extension import BaseExtension
 from utils.git_utils import git_clone_wrapper
+from utils.http_utils import http_get_cached
 from utils.input_utils import get_selection_input
 from utils.instance_type import InstanceType
 from utils.instance_utils import get_instances
@@ -118,17 +118,16 @@ class MainsailThemeInstallMenu(BaseMenu):
         print(menu, end="")
 
     def load_themes(self) -> List[ThemeData]:
-        with urllib.request.urlopen(self.THEMES_URL) as response:
-            themes: List[ThemeData] = []
-            content: str = response.read().decode()
-            csv_data: List[str] = content.splitlines()
-            fieldnames = ["name", "short_note", "author", "repo"]
-            csv_reader = csv.DictReader(csv_data, fieldnames=fieldnames, delimiter=",")
-            next(csv_reader)  # skip the header of the csv file
-            for row in csv_reader:
-                row: Dict[str, str]  # type: ignore
-                theme: ThemeData = ThemeData(**row)
-                themes.append(theme)
+        themes: List[ThemeData] = []
+        content: str = http_get_cached(self.THEMES_URL).decode()
+        csv_data: List[str] = content.splitlines()
+        fieldnames = ["name", "short_note", "author", "repo"]
+        csv_reader = csv.DictReader(csv_data, fieldnames=fieldnames, delimiter=",")
+        next(csv_reader)  # skip the header of the csv file
+        for row in csv_reader:
+            row: Dict[str, str]  # type: ignore
+            theme: ThemeData = ThemeData(**row)
+            themes.append(theme)
 
         return themes
 
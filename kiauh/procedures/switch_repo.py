@@ -8,7 +8,6 @@
 # ======================================================================= #
 from __future__ import annotations
 
-import shutil
 from pathlib import Path
 from typing import Literal
 
@@ -31,6 +30,7 @@ from components.moonraker.services.moonraker_setup_service import (
 from core.instance_manager.instance_manager import InstanceManager
 from core.logger import Logger
 from core.services.backup_service import BackupService
+from core.services.restore_service import RestoreService
 from core.settings.kiauh_settings import KiauhSettings
 from utils.git_utils import GitException, git_clone_wrapper
 from utils.instance_utils import get_instances
@@ -38,6 +38,7 @@ from utils.sys_utils import (
     VenvCreationFailedException,
     create_python_venv,
     install_python_requirements,
+    update_python_venv,
 )
 
 
@@ -68,13 +69,13 @@ def run_switch_repo_routine(
 
     try:
         svc = BackupService()
-        svc.backup_directory(
+        repo_dir_backup_path = svc.backup_directory(
             source_path=repo_dir,
             backup_name=name,
             target_path=name,
         )
         env_backup_name: str = f"{name if name == 'moonraker' else 'klippy'}-env"
-        svc.backup_directory(
+        env_dir_backup_path = svc.backup_directory(
             source_path=env_dir,
             backup_name=env_backup_name,
             target_path=name,
@@ -93,20 +94,22 @@ def run_switch_repo_routine(
         elif name == "moonraker":
             install_moonraker_packages()
 
-        # step 6: recreate python virtualenv
-        Logger.print_status(f"Recreating {_type.__name__} virtualenv ...")
+        # step 6: update or recreate python virtualenv
+        Logger.print_status(f"Updating {_type.__name__} virtualenv ...")
 
         settings = KiauhSettings()
         if name == "klipper":
             use_python_binary = settings.klipper.use_python_binary
         elif name == "moonraker":
             use_python_binary = settings.moonraker.use_python_binary
-            
-        if not create_python_venv(
-            env_dir, force=True, use_python_binary=use_python_binary
-        ):
-            raise GitException(f"Failed to recreate virtualenv for {_type.__name__}")
-        else:
+
+        if not update_python_venv(env_dir, req_file, use_python_binary):
+            if not create_python_venv(
+                env_dir, force=True, use_python_binary=use_python_binary
+            ):
+                raise GitException(
+                    f"Failed to recreate virtualenv for {_type.__name__}"
+                )
             install_python_requirements(env_dir, req_file)
 
         Logger.print_ok(f"Switched to {repo_url} at branch {branch}!")
@@ -149,12 +152,10 @@ def _restore_repo_backup(
         )
 
     try:
-        if repo_dir.exists():
-            shutil.rmtree(repo_dir)
-            shutil.copytree(repo_dir_backup_path, repo_dir)
-        if env_dir.exists():
-            shutil.rmtree(env_dir)
-            shutil.copytree(env_dir_backup_path, env_dir)
+        # only the files changed since the backup are copied back
+        svc = RestoreService()
+        svc.restore(repo_dir_backup_path, repo_dir, delete_extra=True)
+        svc.restore(env_dir_backup_path, env_dir, delete_extra=True)
         Logger.print_warn(f"Restored backup of {name} successfully!")
     except Exception as e:
         raise RepoSwitchFailedException(f"Error restoring backup: {e}")
@@ -9,6 +9,7 @@
 
 from __future__ import annotations
 
+import hashlib
 import re
 from datetime import datetime
 from pathlib import Path
@@ -17,17 +18,16 @@ from typing import Dict, List, Literal, Set
 from components.moonraker.moonraker import Moonraker
 from core.constants import (
     GLOBAL_DEPS,
+    SYSTEMD,
 )
 from core.logger import DialogType, Logger
+from core.services.status_cache import StatusCache
 from core.types.color import Color
 from core.types.component_status import ComponentStatus, StatusCode
 from utils.git_utils import (
-    get_current_branch,
-    get_local_commit,
+    GitRepoInfo,
     get_local_tags,
-    get_remote_commit,
-    get_repo_name,
-    get_repo_url,
+    get_repo_info,
 )
 from utils.instance_utils import get_instances
 from utils.sys_utils import (
@@ -98,21 +98,45 @@ def get_install_status(
     files: List[Path] | None = None,
 ) -> ComponentStatus:
     """
-    Helper method to get the installation status of software components
+    Helper method to get the installation status of software components.
+    The result is cached on disk and reused as long as none of the files
+    that influence the status have changed.
     :param repo_dir: the repository directory
     :param env_dir: the python environment directory
     :param instance_type: The component type
     :param files: List of optional files to check for existence
     :return: Dictionary with status string, statuscode and instance count
     """
+    cache = StatusCache()
+    key = _get_status_cache_key(repo_dir, env_dir, instance_type, files)
+    fingerprint = cache.fingerprint(
+        _get_status_watch_list(repo_dir, env_dir, instance_type, files)
+    )
+
+    cached_status = cache.get(key, fingerprint)
+    if cached_status is not None:
+        return cached_status
+
+    status = _read_install_status(repo_dir, env_dir, instance_type, files)
+    cache.set(key, fingerprint, status)
+
+    return status
+
+
+def _read_install_status(
+    repo_dir: Path,
+    env_dir: Path | None = None,
+    instance_type: type | None = None,
+    files: List[Path] | None = None,
+) -> ComponentStatus:
     from utils.instance_utils import get_instances
 
     checks = []
-    branch: str | None = None
+    repo_info = GitRepoInfo()
 
     if repo_dir.exists():
         checks.append(True)
-        branch = get_current_branch(repo_dir)
+        repo_info = get_repo_info(repo_dir)
 
     if env_dir is not None:
         checks.append(env_dir.exists())
@@ -134,21 +158,59 @@ def get_install_status(
     else:
         status = 1  # incomplete
 
-    org, repo = get_repo_name(repo_dir)
-    repo_url = get_repo_url(repo_dir) if repo_dir.exists() else None
-
     return ComponentStatus(
         status=status,
         instances=instances,
-        owner=org,
-        repo=repo,
-        repo_url=repo_url,
-        branch=branch,
-        local=get_local_commit(repo_dir),
-        remote=get_remote_commit(repo_dir),
+        owner=repo_info.owner,
+        repo=repo_info.name,
+        repo_url=repo_info.url,
+        branch=repo_info.branch,
+        local=repo_info.local,
+        remote=repo_info.remote,
     )
 
 
+def _get_status_cache_key(
+    repo_dir: Path,
+    env_dir: Path | None,
+    instance_type: type | None,
+    files: List[Path] | None,
+) -> str:
+    args = [repo_dir, env_dir, instance_type.__name__ if instance_type else None]
+    args.extend(files or [])
+    digest = hashlib.sha1(repr(args).encode("utf-8")).hexdigest()[:12]
+    return f"{repo_dir.name}-{digest}"
+
+
+def _get_status_watch_list(
+    repo_dir: Path,
+    env_dir: Path | None,
+    instance_type: type | None,
+    files: List[Path] | None,
+) -> List[Path]:
+    git_dir = repo_dir.joinpath(".git")
+    watched = [
+        repo_dir,
+        git_dir,
+        git_dir.joinpath("HEAD"),
+        git_dir.joinpath("FETCH_HEAD"),
+        git_dir.joinpath("ORIG_HEAD"),
+        git_dir.joinpath("packed-refs"),
+        git_dir.joinpath("config"),
+        # the reflog of HEAD is appended on every commit, pull, reset or checkout
+        git_dir.joinpath("logs/HEAD"),
+    ]
+    if env_dir is not None:
+        watched.append(env_dir)
+    if instance_type is not None:
+        # adding or removing unit files changes the mtime of the directory
+        watched.append(SYSTEMD)
+    if files is not None:
+        watched.extend(files)
+
+    return watched
+
+
 def moonraker_exists(name: str = "") -> List[Moonraker]:
     """
     Helper method to check if a Moonraker instance exists
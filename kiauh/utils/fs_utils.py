@@ -13,10 +13,12 @@ from __future__ import annotations
 import os
 import re
 import shutil
-from pathlib import Path
+import struct
+import zlib
+from pathlib import Path, PurePosixPath
 from subprocess import DEVNULL, PIPE, CalledProcessError, call, check_output, run
-from typing import List
-from zipfile import ZipFile
+from typing import BinaryIO, List, Tuple
+from zipfile import BadZipFile, ZipFile
 
 from core.decorators import deprecated
 from core.logger import Logger
@@ -140,6 +142,186 @@ def unzip(filepath: Path, target_dir: Path) -> None:
         _zip.extractall(target_dir)
 
 
+def replace_directory(source: Path, target: Path) -> None:
+    """
+    Helper function to swap a fully prepared directory in place of another one.
+    Both renames happen right after each other, so the target is never
+    partially written. If the second rename fails, the old target is restored |
+    :param source: the directory to move to the target path
+    :param target: the directory to replace, does not need to exist
+    :return: None
+    """
+    old = target.with_name(f".{target.name}.old")
+    if old.exists():
+        shutil.rmtree(old)
+
+    if target.exists():
+        os.rename(target, old)
+    try:
+        os.rename(source, target)
+    except OSError:
+        if old.exists():
+            os.rename(old, target)
+        raise
+
+    if old.exists():
+        shutil.rmtree(old)
+
+
+ZIP_LOCAL_HEADER = b"PK\x03\x04"
+ZIP_CENTRAL_HEADER = b"PK\x01\x02"
+ZIP_DATA_DESCRIPTOR = b"PK\x07\x08"
+ZIP_END_HEADER = b"PK\x05\x06"
+ZIP_CHUNK_SIZE = 64 * 1024
+
+
+def unzip_stream(stream: BinaryIO, target_dir: Path) -> None:
+    """
+    Helper function to extract a zip-archive while it is read from a stream,
+    e.g. an HTTP response, without storing the archive itself. The entries are
+    read from their local file headers, only stored and deflated entries are
+    supported. The stream is read until its end, even after the last entry. |
+    :param stream: binary stream of the zip-archive
+    :param target_dir: the target directory to extract the files into
+    :return: None
+    :raises BadZipFile: if the archive is invalid or uses unsupported features
+    """
+    reader = _ZipStreamReader(stream)
+    target_dir.mkdir(parents=True, exist_ok=True)
+
+    while (signature := reader.read_exact(4)) == ZIP_LOCAL_HEADER:
+        header = reader.read_exact(26)
+        _, flags, method, _, _, crc, csize, usize, name_len, extra_len = struct.unpack(
+            "<HHHHHIIIHH", header
+        )
+        raw_name = reader.read_exact(name_len)
+        extra = reader.read_exact(extra_len)
+        name = raw_name.decode("utf-8" if flags & 0x800 else "cp437")
+
+        zip64_sizes = _read_zip64_sizes(extra)
+        is_zip64 = zip64_sizes is not None
+        if zip64_sizes is not None and csize == 0xFFFFFFFF:
+            usize, csize = zip64_sizes
+
+        has_descriptor = bool(flags & 0x08)
+        if flags & 0x01:
+            raise BadZipFile(f"Encrypted entry '{name}' is not supported")
+        if method not in (0, 8) or (method == 0 and has_descriptor):
+            raise BadZipFile(f"Unsupported compression of entry '{name}'")
+
+        target = _get_zip_entry_target(target_dir, name)
+        if name.endswith("/"):
+            target.mkdir(parents=True, exist_ok=True)
+            f = None
+        else:
+            target.parent.mkdir(parents=True, exist_ok=True)
+            f = open(target, "wb")
+
+        try:
+            checksum = _extract_zip_entry(
+                reader, f, method, None if has_descriptor else csize
+            )
+        finally:
+            if f is not None:
+                f.close()
+
+        if has_descriptor:
+            crc = _read_zip_data_descriptor(reader, is_zip64)
+        if checksum != crc:
+            raise BadZipFile(f"Bad CRC-32 for entry '{name}'")
+
+    if signature not in (ZIP_CENTRAL_HEADER, ZIP_END_HEADER):
+        raise BadZipFile("File is not a zip file")
+
+    # consume the central directory, so the whole stream passed through
+    while reader.read(ZIP_CHUNK_SIZE):
+        pass
+
+
+class _ZipStreamReader:
+    def __init__(self, stream: BinaryIO) -> None:
+        self._stream = stream
+        self._buffer = b""
+
+    def read(self, size: int) -> bytes:
+        if self._buffer:
+            data, self._buffer = self._buffer[:size], self._buffer[size:]
+            return data
+        return self._stream.read(size)
+
+    def read_exact(self, size: int) -> bytes:
+        data = b""
+        while len(data) < size:
+            chunk = self.read(size - len(data))
+            if not chunk:
+                raise BadZipFile("Unexpected end of zip stream")
+            data += chunk
+        return data
+
+    def unread(self, data: bytes) -> None:
+        self._buffer = data + self._buffer
+
+
+def _read_zip64_sizes(extra: bytes) -> Tuple[int, int] | None:
+    pos = 0
+    while pos + 4 <= len(extra):
+        header_id, size = struct.unpack("<HH", extra[pos : pos + 4])
+        if header_id == 0x0001 and size >= 16:
+            usize, csize = struct.unpack("<QQ", extra[pos + 4 : pos + 20])
+            return usize, csize
+        pos += 4 + size
+    return None
+
+
+def _get_zip_entry_target(target_dir: Path, name: str) -> Path:
+    parts = PurePosixPath(name.replace("\\", "/")).parts
+    if not parts or parts[0] == "/" or ".." in parts:
+        raise BadZipFile(f"Unsafe path in zip entry '{name}'")
+    return target_dir.joinpath(*parts)
+
+
+def _extract_zip_entry(
+    reader: _ZipStreamReader, f: BinaryIO | None, method: int, csize: int | None
+) -> int:
+    crc = 0
+    decompressor = zlib.decompressobj(-15) if method == 8 else None
+    remaining = csize
+
+    while remaining is None or remaining > 0:
+        size = ZIP_CHUNK_SIZE if remaining is None else min(remaining, ZIP_CHUNK_SIZE)
+        chunk = reader.read(size)
+        if not chunk:
+            raise BadZipFile("Unexpected end of zip stream")
+        if remaining is not None:
+            remaining -= len(chunk)
+
+        data = chunk
+        if decompressor is not None:
+            data = decompressor.decompress(chunk)
+
+        crc = zlib.crc32(data, crc)
+        if f is not None:
+            f.write(data)
+
+        if decompressor is not None and decompressor.eof:
+            # the end of a deflate stream is known without its size,
+            # hand everything read beyond it back to the reader
+            reader.unread(decompressor.unused_data)
+            break
+
+    return crc
+
+
+def _read_zip_data_descriptor(reader: _ZipStreamReader, is_zip64: bool) -> int:
+    # the signature of the data descriptor is optional
+    data = reader.read_exact(4)
+    if data == ZIP_DATA_DESCRIPTOR:
+        data = reader.read_exact(4)
+    crc: int = struct.unpack("<I", data)[0]
+    reader.read_exact(16 if is_zip64 else 8)
+    return crc
+
+
 def create_folders(dirs: List[Path]) -> None:
     try:
         for _dir in dirs:
@@ -2,8 +2,8 @@ from __future__ import annotations
 
 import json
 import shutil
-import urllib.request
-from http.client import HTTPResponse
+import urllib.error
+from dataclasses import dataclass
 from json import JSONDecodeError
 from pathlib import Path
 from subprocess import DEVNULL, PIPE, CalledProcessError, check_output, run
@@ -11,6 +11,7 @@ from typing import List, Tuple, Type
 
 from core.instance_manager.instance_manager import InstanceManager
 from core.logger import Logger
+from utils.http_utils import http_get_cached
 from utils.input_utils import get_confirm, get_number_input
 from utils.instance_type import InstanceType
 from utils.instance_utils import get_instances
@@ -20,6 +21,26 @@ class GitException(Exception):
     pass
 
 
+@dataclass
+class GitRepoInfo:
+    """
+    Metadata of a local Git repository, collected in a single pass
+    :param branch: currently checked out branch, None if HEAD is detached
+    :param url: URL of the 'origin' remote
+    :param owner: owner / organisation part of the origin URL
+    :param name: repository name part of the origin URL
+    :param local: short description of HEAD, e.g. 'v0.12.0-123'
+    :param remote: short description of the upstream branch
+    """
+
+    branch: str | None = None
+    url: str | None = None
+    owner: str | None = None
+    name: str | None = None
+    local: str | None = None
+    remote: str | None = None
+
+
 def git_clone_wrapper(
     repo: str, target_dir: Path, branch: str | None = None, force: bool = False
 ) -> None:
@@ -85,16 +106,102 @@ def get_repo_name(repo: Path) -> Tuple[str | None, str | None]:
     try:
         cmd = ["git", "-C", repo.as_posix(), "config", "--get", "remote.origin.url"]
         result: str = check_output(cmd, stderr=DEVNULL).decode(encoding="utf-8")
-        substrings: List[str] = result.strip().split("/")[-2:]
+        return _split_repo_url(result.strip())
 
-        orga: str | None = substrings[0] if substrings[0] else None
-        name: str | None = substrings[1] if substrings[1] else None
+    except CalledProcessError:
+        return None, None
 
-        return orga, name.replace(".git", "") if name else None
 
-    except CalledProcessError:
+def get_repo_info(repo: Path) -> GitRepoInfo:
+    """
+    Collect branch, origin URL and the local and upstream descriptions of a
+    repository at once. HEAD and the config are read directly from the '.git'
+    directory, both descriptions are resolved by a single 'git describe' call |
+    :param repo: Path to the local Git repository
+    :return: GitRepoInfo, fields that could not be determined are None
+    """
+    git_dir = repo.joinpath(".git")
+    if not git_dir.exists():
+        return GitRepoInfo(url=get_repo_url(repo))
+
+    if git_dir.is_dir():
+        branch = _read_head_branch(git_dir)
+        url = _read_origin_url(git_dir)
+    else:
+        # '.git' is a file in worktrees and submodules, let git resolve it
+        branch = get_current_branch(repo) or None
+        url = get_repo_url(repo)
+
+    owner, name = _split_repo_url(url) if url else (None, None)
+
+    revs = ["HEAD"] if branch is None else ["HEAD", f"origin/{branch}"]
+    descriptions = _describe_revs(repo, revs)
+    if descriptions is None and len(revs) > 1:
+        # the upstream branch does not exist, describe HEAD on its own
+        descriptions = _describe_revs(repo, revs[:1])
+
+    local = descriptions[0] if descriptions else None
+    remote = descriptions[1] if descriptions and len(descriptions) > 1 else None
+
+    return GitRepoInfo(
+        branch=branch,
+        url=url,
+        owner=owner,
+        name=name,
+        local=local,
+        remote=remote,
+    )
+
+
+def _split_repo_url(url: str) -> Tuple[str | None, str | None]:
+    substrings: List[str] = url.split("/")[-2:]
+    if len(substrings) < 2:
         return None, None
 
+    orga: str | None = substrings[0] if substrings[0] else None
+    name: str | None = substrings[1] if substrings[1] else None
+
+    return orga, name.replace(".git", "") if name else None
+
+
+def _read_head_branch(git_dir: Path) -> str | None:
+    try:
+        head = git_dir.joinpath("HEAD").read_text(encoding="utf-8").strip()
+    except OSError:
+        return None
+
+    prefix = "ref: refs/heads/"
+    return head[len(prefix) :] if head.startswith(prefix) else None
+
+
+def _read_origin_url(git_dir: Path) -> str | None:
+    try:
+        lines = git_dir.joinpath("config").read_text(encoding="utf-8").splitlines()
+    except OSError:
+        return None
+
+    in_origin = False
+    for line in lines:
+        line = line.strip()
+        if line.startswith("["):
+            in_origin = line.replace(" ", "").lower() == '[remote"origin"]'
+        elif in_origin and "=" in line:
+            key, value = line.split("=", 1)
+            if key.strip().lower() == "url":
+                return value.strip().strip('"')
+
+    return None
+
+
+def _describe_revs(repo: Path, revs: List[str]) -> List[str] | None:
+    try:
+        cmd = ["git", "describe", "--always", "--tags", *revs]
+        result = check_output(cmd, stderr=DEVNULL, text=True, cwd=repo)
+        # only keep '<tag>-<commits>' and drop the '-g<hash>' part
+        return ["-".join(line.split("-")[:2]) for line in result.split()]
+    except (CalledProcessError, OSError):
+        return None
+
 
 def get_current_branch(repo: Path) -> str | None:
     """
@@ -196,22 +303,15 @@ def get_local_tags(repo_path: Path, _filter: str | None = None) -> List[str]:
 
 def get_remote_tags(repo_path: str) -> List[str]:
     """
-    Gets the tags of a GitHub repostiory
+    Gets the tags of a GitHub repostiory.
+    Responses are cached and revalidated with conditional requests.
     :param repo_path: path of the GitHub repository - e.g. `<owner>/<name>`
     :return: List of tags
     """
     try:
         url = f"https://api.github.com/repos/{repo_path}/tags"
-        with urllib.request.urlopen(url) as r:
-            response: HTTPResponse = r
-            if response.getcode() != 200:
-                Logger.print_error(
-                    f"Error retrieving tags: HTTP status code {response.getcode()}"
-                )
-                return []
-
-            data = json.loads(response.read())
-            return [item["name"] for item in data]
+        data = json.loads(http_get_cached(url))
+        return [item["name"] for item in data]
     except (JSONDecodeError, TypeError) as e:
         Logger.print_error(f"Error while processing the response: {e}")
         raise
@@ -251,6 +351,38 @@ def get_latest_unstable_tag(repo_path: str) -> str:
         raise
 
 
+def get_release_asset_sha256(
+    repo_path: str, asset_name: str, tag: str | None = None
+) -> Tuple[str | None, str | None]:
+    """
+    Gets the tag of a release and the SHA-256 digest GitHub publishes for one
+    of its assets. Both come from the same response, so the digest always
+    belongs to the returned tag, even if the response is a stale cached one
+    :param repo_path: path of the GitHub repository - e.g. `<owner>/<name>`
+    :param asset_name: file name of the release asset
+    :param tag: tag of the release, the latest release if None
+    :return: tag and hex digest, None if the release or digest is not available
+    """
+    release = f"tags/{tag}" if tag else "latest"
+    url = f"https://api.github.com/repos/{repo_path}/releases/{release}"
+    try:
+        data = json.loads(http_get_cached(url))
+    except (urllib.error.URLError, OSError, ValueError):
+        return None, None
+    if not isinstance(data, dict):
+        return None, None
+
+    release_tag = data.get("tag_name")
+    release_tag = str(release_tag) if release_tag else None
+    for asset in data.get("assets") or []:
+        if not isinstance(asset, dict):
+            continue
+        digest = asset.get("digest") or ""
+        if asset.get("name") == asset_name and digest.startswith("sha256:"):
+            return release_tag, str(digest[len("sha256:") :])
+    return release_tag, None
+
+
 def compare_semver_tags(tag1: str, tag2: str) -> bool:
     """
     Compare two semver version strings.
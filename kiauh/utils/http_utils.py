@@ -0,0 +1,315 @@
+# ======================================================================= #
+#  Copyright (C) 2020 - 2026 Dominik Willner <th33xitus@gmail.com>        #
+#                                                                         #
+#  This file is part of KIAUH - Klipper Installation And Update Helper    #
+#  https://github.com/dw-0/kiauh                                          #
+#                                                                         #
+#  This file may be distributed under the terms of the GNU GPLv3 license  #
+# ======================================================================= #
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import tempfile
+import time
+import urllib.error
+import urllib.request
+from http.client import HTTPException, HTTPResponse
+from json import JSONDecodeError
+from pathlib import Path
+from typing import Any, Callable, Dict, Tuple
+
+from core.constants import KIAUH_CACHE_DIR
+
+HTTP_CACHE_DIR = KIAUH_CACHE_DIR.joinpath("http")
+HTTP_TIMEOUT = 15
+HTTP_USER_AGENT = "kiauh"
+
+# used if no TTL is passed and none is configured in the kiauh.cfg
+DEFAULT_CACHE_TTL = 300
+
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+DOWNLOAD_RETRIES = 5
+DOWNLOAD_BACKOFF = 1.0
+DOWNLOAD_BACKOFF_MAX = 30.0
+# status codes worth retrying, every other HTTP error is considered permanent
+RETRY_STATUS_CODES = (408, 429, 500, 502, 503, 504)
+
+# called with the amount of downloaded bytes and the total size, -1 if unknown
+ProgressHook = Callable[[int, int], None]
+
+
+class DownloadError(Exception):
+    pass
+
+
+def http_open(
+    url: str, headers: Dict[str, str] | None = None, timeout: float = HTTP_TIMEOUT
+) -> HTTPResponse:
+    """
+    Open a GET request. All HTTP requests of KIAUH should go through this
+    function, so they share the same headers and timeout |
+    :param url: the url to request
+    :param headers: optional, additional request headers
+    :param timeout: timeout in seconds for connecting and reading
+    :return: the response, has to be closed by the caller
+    """
+    request_headers = {"User-Agent": HTTP_USER_AGENT}
+    request_headers.update(headers or {})
+    request = urllib.request.Request(url, headers=request_headers)
+    response: HTTPResponse = urllib.request.urlopen(request, timeout=timeout)
+    return response
+
+
+def http_get_cached(url: str, ttl: int | None = None) -> bytes:
+    """
+    Get the body of a GET request through the persistent HTTP cache.
+    A cached body younger than the TTL is returned without any request.
+    Otherwise, a conditional request using the stored ETag and Last-Modified
+    headers is sent, so an unchanged resource is answered with a 304 that
+    does not count against the GitHub API rate limit. If the request fails,
+    e.g. because the host is offline, a stale cached body is returned. |
+    :param url: the url to request
+    :param ttl: time in seconds a cached body is used without revalidation
+    :return: the response body
+    :raises urllib.error.URLError: if the request failed and nothing is cached
+    """
+    ttl = ttl if ttl is not None else _get_configured_ttl()
+    meta_file, body_file = _get_cache_files(url)
+    meta = _read_cache_meta(meta_file) if body_file.exists() else {}
+
+    if meta and time.time() - float(meta.get("fetched_at", 0)) < ttl:
+        return body_file.read_bytes()
+
+    headers: Dict[str, str] = {}
+    if meta.get("etag"):
+        headers["If-None-Match"] = meta["etag"]
+    if meta.get("last_modified"):
+        headers["If-Modified-Since"] = meta["last_modified"]
+
+    try:
+        with http_open(url, headers) as response:
+            body: bytes = response.read()
+            meta = {
+                "url": url,
+                "etag": response.headers.get("ETag"),
+                "last_modified": response.headers.get("Last-Modified"),
+            }
+    except urllib.error.HTTPError as e:
+        if e.code == 304 and meta:
+            body = body_file.read_bytes()
+        elif meta:
+            # e.g. rate limited, serve the stale body
+            return body_file.read_bytes()
+        else:
+            raise
+    except (urllib.error.URLError, OSError):
+        if not meta:
+            raise
+        return body_file.read_bytes()
+
+    meta["fetched_at"] = time.time()
+    _write_cache_files(meta_file, body_file, meta, body)
+
+    return body
+
+
+def http_download(
+    url: str,
+    target: Path,
+    sha256: str | None = None,
+    retries: int = DOWNLOAD_RETRIES,
+    progress: ProgressHook | None = None,
+) -> None:
+    """
+    Stream a file to the target path with bounded memory. The data is written
+    to '<target>.part' first, an interrupted transfer is resumed with an HTTP
+    Range request and retried with exponential backoff. A '.part' file left
+    over from an earlier run is resumed as well, if the ETag or Last-Modified
+    value saved next to it still matches the file on the server, otherwise
+    the download starts over. The file is only moved to
+    the target path after the download completed and, if given, the SHA-256
+    checksum matched. |
+    :param url: the url to download
+    :param target: the target path incl filename
+    :param sha256: optional, expected hex SHA-256 digest of the file
+    :param retries: how often a failed transfer is retried
+    :param progress: optional hook, called after every written chunk
+    :return: None
+    :raises DownloadError: if the checksum does not match
+    """
+    part = target.with_name(f"{target.name}.part")
+    validator_file = part.with_name(f"{part.name}.validator")
+    hasher = hashlib.sha256()
+    offset = 0
+    validator: str | None = None
+
+    if part.exists():
+        validator = _read_validator(validator_file)
+        if validator is None:
+            # the data can not be matched to the current file, start over
+            part.unlink()
+        else:
+            # hash the data of the earlier run, so the file is not read twice
+            with open(part, "rb") as f:
+                while chunk := f.read(DOWNLOAD_CHUNK_SIZE):
+                    hasher.update(chunk)
+                    offset += len(chunk)
+
+    attempt = 0
+    while True:
+        headers: Dict[str, str] = {}
+        if offset > 0 and validator is not None:
+            headers["Range"] = f"bytes={offset}-"
+            # if the file changed in the meantime, the server sends all of it
+            headers["If-Range"] = validator
+
+        try:
+            with http_open(url, headers) as response:
+                if offset > 0 and response.status != 206:
+                    # range not supported or file changed, start over
+                    offset, hasher = 0, hashlib.sha256()
+                if offset == 0:
+                    validator = _get_validator(response)
+                    _save_validator(validator_file, validator)
+
+                length = int(response.headers.get("Content-Length", -1))
+                total = offset + length if length >= 0 else -1
+
+                with open(part, "ab" if offset > 0 else "wb") as f:
+                    while chunk := response.read(DOWNLOAD_CHUNK_SIZE):
+                        f.write(chunk)
+                        hasher.update(chunk)
+                        offset += len(chunk)
+                        if progress is not None:
+                            progress(offset, total)
+
+                if 0 <= total != offset:
+                    raise HTTPException(f"Connection closed at {offset}/{total} bytes")
+            break
+
+        except urllib.error.HTTPError as e:
+            if e.code == 416:
+                # requested range not satisfiable, the part file is unusable
+                part.unlink(missing_ok=True)
+                validator_file.unlink(missing_ok=True)
+                offset, hasher, validator = 0, hashlib.sha256(), None
+            elif e.code not in RETRY_STATUS_CODES:
+                raise
+            attempt = _wait_for_retry(attempt, retries, e)
+        except (urllib.error.URLError, HTTPException, OSError) as e:
+            attempt = _wait_for_retry(attempt, retries, e)
+
+    if sha256 is not None and hasher.hexdigest() != sha256.lower():
+        part.unlink(missing_ok=True)
+        validator_file.unlink(missing_ok=True)
+        raise DownloadError(
+            f"Checksum mismatch for '{target.name}': "
+            f"expected {sha256.lower()}, got {hasher.hexdigest()}"
+        )
+
+    os.replace(part, target)
+    validator_file.unlink(missing_ok=True)
+
+
+def _get_validator(response: HTTPResponse) -> str | None:
+    # If-Range only accepts a strong ETag, weak ones start with 'W/'
+    etag = response.headers.get("ETag")
+    if etag and not etag.startswith("W/"):
+        return str(etag)
+    last_modified = response.headers.get("Last-Modified")
+    return str(last_modified) if last_modified else None
+
+
+def _read_validator(path: Path) -> str | None:
+    try:
+        return path.read_text(encoding="utf-8").strip() or None
+    except OSError:
+        return None
+
+
+def _save_validator(path: Path, validator: str | None) -> None:
+    # without a validator, a '.part' file of this transfer can not be resumed
+    # by a later run, failing to save it only costs a full download
+    try:
+        if validator is None:
+            path.unlink(missing_ok=True)
+        else:
+            path.write_text(validator, encoding="utf-8")
+    except OSError:
+        pass
+
+
+class HttpStream:
+    """
+    Wraps an HTTP response and computes the SHA-256 digest and the
+    progress of everything that is read from it.
+    """
+
+    def __init__(
+        self, response: HTTPResponse, progress: ProgressHook | None = None
+    ) -> None:
+        self._response = response
+        self._progress = progress
+        self._hasher = hashlib.sha256()
+        self._read = 0
+        self._total = int(response.headers.get("Content-Length", -1))
+
+    def read(self, size: int = -1) -> bytes:
+        data: bytes = self._response.read(size)
+        self._hasher.update(data)
+        self._read += len(data)
+        if self._progress is not None and data:
+            self._progress(self._read, self._total)
+        return data
+
+    def hexdigest(self) -> str:
+        return self._hasher.hexdigest()
+
+
+def _wait_for_retry(attempt: int, retries: int, error: Exception) -> int:
+    if attempt >= retries:
+        raise error
+    time.sleep(min(DOWNLOAD_BACKOFF * 2**attempt, DOWNLOAD_BACKOFF_MAX))
+    return attempt + 1
+
+
+def _get_configured_ttl() -> int:
+    from core.settings.kiauh_settings import KiauhSettings
+
+    ttl = KiauhSettings().kiauh.http_cache_ttl
+    return ttl if ttl is not None else DEFAULT_CACHE_TTL
+
+
+def _get_cache_files(url: str) -> Tuple[Path, Path]:
+    key = hashlib.sha256(url.encode("utf-8")).hexdigest()
+    return HTTP_CACHE_DIR.joinpath(f"{key}.json"), HTTP_CACHE_DIR.joinpath(key)
+
+
+def _read_cache_meta(meta_file: Path) -> Dict[str, Any]:
+    try:
+        with open(meta_file, "r", encoding="utf-8") as f:
+            meta: Dict[str, Any] = json.load(f)
+            return meta
+    except (OSError, JSONDecodeError):
+        return {}
+
+
+def _write_cache_files(
+    meta_file: Path, body_file: Path, meta: Dict[str, Any], body: bytes
+) -> None:
+    # failing to write the cache is not considered an error
+    try:
+        HTTP_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=HTTP_CACHE_DIR, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.write(body)
+        os.replace(tmp, body_file)
+
+        fd, tmp = tempfile.mkstemp(dir=HTTP_CACHE_DIR, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        os.replace(tmp, meta_file)
+    except OSError:
+        return
@@ -8,14 +8,12 @@
 # ======================================================================= #
 from __future__ import annotations
 
-import re
-from pathlib import Path
 from typing import List
 
 from components.klipper.klipper import Klipper
-from core.constants import SYSTEMD
 from core.instance_manager.base_instance import SUFFIX_BLACKLIST
 from core.instance_manager.instance_manager import InstanceManager
+from core.instance_manager.instance_registry import InstanceRegistry
 from core.logger import DialogType, Logger
 from utils.input_utils import get_confirm
 from utils.instance_type import InstanceType
@@ -30,17 +28,10 @@ def get_instances(
         raise ValueError("instance_type must be a class")
 
     name = convert_camelcase_to_kebabcase(instance_type.__name__)
-    pattern = re.compile(f"^{name}(-[0-9a-zA-Z]+)?.service$")
-
-    service_list = [
-        Path(SYSTEMD, service)
-        for service in SYSTEMD.iterdir()
-        if pattern.search(service.name)
-        and not any(s in service.name for s in suffix_blacklist)
-    ]
-
     instance_list = [
-        instance_type(get_instance_suffix(name, service)) for service in service_list
+        instance_type(suffix)
+        for file_name, suffix in InstanceRegistry().get_service_units(name)
+        if not any(s in file_name for s in suffix_blacklist)
     ]
 
     def _sort_instance_list(suffix: int | str | None):
@@ -54,14 +45,6 @@ def get_instances(
     return sorted(instance_list, key=lambda x: _sort_instance_list(x.suffix))
 
 
-def get_instance_suffix(name: str, file_path: Path) -> str:
-    # to get the suffix of the instance, we remove the name of the instance from
-    # the file name, if the remaining part an empty string we return it
-    # otherwise there is and hyphen left, and we return the part after the hyphen
-    suffix = file_path.stem[len(name) :]
-    return suffix[1:] if suffix else ""
-
-
 def stop_klipper_instances_interactively(
     kl_instances: List[Klipper], operation_name: str = "operation"
 ) -> bool:
@@ -8,6 +8,8 @@
 # ======================================================================= #
 from __future__ import annotations
 
+import hashlib
+import json
 import os
 import re
 import select
@@ -16,16 +18,28 @@ import socket
 import sys
 import time
 import urllib.error
-import urllib.request
+from dataclasses import dataclass, field
 from pathlib import Path
 from subprocess import DEVNULL, PIPE, CalledProcessError, Popen, check_output, run
-from typing import List, Literal, Set, Tuple
+from typing import Dict, List, Literal, Set, Tuple
 
 from core.constants import SYSTEMD
+from core.instance_manager.instance_registry import InstanceRegistry
 from core.logger import Logger
-from utils.fs_utils import check_file_exist, remove_with_sudo
+from core.services.python_installer import get_python_installer
+from core.services.wheelhouse import Wheelhouse, is_index_reachable
+from utils.fs_utils import check_file_exist, remove_with_sudo, unzip_stream
+from utils.http_utils import (
+    DownloadError,
+    HttpStream,
+    http_download,
+    http_open,
+)
 from utils.input_utils import get_confirm
 
+# digests of the installed requirements files, stored inside the virtualenv
+REQUIREMENTS_STAMP_FILE = "kiauh-requirements.json"
+
 SysCtlServiceAction = Literal[
     "start",
     "stop",
@@ -38,6 +52,39 @@ SysCtlServiceAction = Literal[
 ]
 SysCtlManageAction = Literal["daemon-reload", "reset-failed"]
 
+# unit states reported by 'systemctl is-active' and 'systemctl is-enabled'
+# that count as success for the given action
+SYSCTL_ACTION_STATES: Dict[SysCtlServiceAction, Tuple[str, Set[str]]] = {
+    "start": ("is-active", {"active", "activating", "reloading"}),
+    "restart": ("is-active", {"active", "activating", "reloading"}),
+    "reload": ("is-active", {"active", "reloading"}),
+    "stop": ("is-active", {"inactive", "failed", "unknown"}),
+    "enable": ("is-enabled", {"enabled", "enabled-runtime", "static", "alias"}),
+    "disable": ("is-enabled", {"disabled", "masked", "static", "not-found"}),
+    "mask": ("is-enabled", {"masked", "masked-runtime"}),
+    "unmask": ("is-enabled", {"enabled", "disabled", "static", "not-found"}),
+}
+
+
+@dataclass
+class SysCtlBatchResult:
+    action: SysCtlServiceAction
+    succeeded: List[str] = field(default_factory=list)
+    # unit name -> state of the unit after the action failed
+    failed: Dict[str, str] = field(default_factory=dict)
+
+    @property
+    def ok(self) -> bool:
+        return not self.failed
+
+
+class SysCtlBatchError(CalledProcessError):
+    """Raised when an action failed for at least one unit of a batch"""
+
+    def __init__(self, result: SysCtlBatchResult, e: CalledProcessError) -> None:
+        super().__init__(e.returncode, e.cmd, e.output, e.stderr)
+        self.result = result
+
 
 class VenvCreationFailedException(Exception):
     pass
@@ -110,16 +157,17 @@ def create_python_venv(
     Logger.print_status("Set up Python virtual environment ...")
     # If binarry override is not set, we use default defined here
     python_binary = use_python_binary if use_python_binary else "/usr/bin/python3"
-    cmd = ["virtualenv", "-p", python_binary, target.as_posix()]
-    cmd.append(
-        "--system-site-packages"
-    ) if allow_access_to_system_site_packages else None
+    installer = get_python_installer()
+    cmd = installer.create_venv_command(
+        target, python_binary, allow_access_to_system_site_packages
+    )
 
     n = 2
     while(n > 0):
         if not target.exists():
             try:
-                run(cmd, check=True)
+                with installer.timed("Setup of virtualenv"):
+                    run(cmd, check=True)
                 Logger.print_ok("Setup of virtualenv successful!")
                 return True
             except CalledProcessError as e:
@@ -146,6 +194,103 @@ def create_python_venv(
                 return False
 
 
+def update_python_venv(
+    target: Path, requirements: Path, use_python_binary: str | None = None
+) -> bool:
+    """
+    Update an existing virtualenv to new requirements without rebuilding it.
+    The virtualenv is cloned with hardlinks into a staging directory, the
+    requirements are installed there and the clone is swapped in only if pip
+    succeeded. If pip fails, the virtualenv is left untouched |
+    :param target: Path of the virtualenv
+    :param requirements: Path to the requirements.txt file
+    :param use_python_binary: the python binary the virtualenv must use
+    :return: False if the virtualenv does not exist or uses another python
+             binary and has to be recreated, True if it was updated
+    """
+    python_binary = use_python_binary if use_python_binary else "/usr/bin/python3"
+    venv_python = target.joinpath("bin/python")
+    if not venv_python.exists() or not target.joinpath("bin/pip").exists():
+        return False
+    if os.path.realpath(venv_python) != os.path.realpath(python_binary):
+        Logger.print_info("Virtualenv uses a different python binary ...")
+        return False
+
+    digest = get_requirements_digest(target, requirements)
+    if (
+        digest is not None
+        and _read_requirements_stamp(target).get(requirements.as_posix()) == digest
+    ):
+        Logger.print_ok("Python requirements unchanged, virtualenv is up to date!")
+        return True
+
+    Logger.print_status("Updating Python virtual environment ...")
+    staging = target.with_name(f".{target.name}.staging")
+    old = target.with_name(f".{target.name}.old")
+    try:
+        for path in (staging, old):
+            if path.exists():
+                shutil.rmtree(path)
+        shutil.copytree(target, staging, symlinks=True, copy_function=_link_or_copy)
+        # the scripts of the clone still run the python of the original
+        _relocate_venv_scripts(staging, target, staging)
+        install_python_requirements(staging, requirements)
+        _relocate_venv_scripts(staging, staging, target)
+
+        os.rename(target, old)
+        try:
+            os.rename(staging, target)
+        except OSError:
+            os.rename(old, target)
+            raise
+    except (OSError, VenvCreationFailedException) as e:
+        shutil.rmtree(staging, ignore_errors=True)
+        log = f"Error updating virtualenv, '{target}' is left unchanged: {e}"
+        Logger.print_error(log)
+        raise VenvCreationFailedException(log)
+
+    shutil.rmtree(old, ignore_errors=True)
+    Logger.print_ok("Virtualenv updated successfully!")
+    return True
+
+
+def _link_or_copy(src: str, dst: str) -> None:
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copy2(src, dst)
+
+
+def _relocate_venv_scripts(venv: Path, old_path: Path, new_path: Path) -> None:
+    """
+    The scripts in the bin directory of a virtualenv reference its absolute
+    path, e.g. in the shebang or the activate scripts, replace that path in
+    them. Only whole occurrences of the path are replaced, not longer paths
+    starting with it like '<path>2', and binary files are left alone
+    """
+    # the path followed by a separator, a quote, whitespace or the end
+    pattern = re.compile(re.escape(old_path.as_posix().encode()) + rb"(?=[/\"'\s]|\Z)")
+    new = new_path.as_posix().encode()
+    with os.scandir(venv.joinpath("bin")) as it:
+        for entry in it:
+            if not entry.is_file(follow_symlinks=False):
+                continue
+            with open(entry.path, "rb") as f:
+                content = f.read()
+            is_script = content.startswith(b"#!") or entry.name.startswith("activate")
+            if not is_script or b"\0" in content:
+                continue
+            content, count = pattern.subn(lambda _: new, content)
+            if count == 0:
+                continue
+            # write a new file, the old one may be hardlinked to the original
+            tmp = f"{entry.path}.tmp"
+            with open(tmp, "wb") as f:
+                f.write(content)
+            shutil.copymode(entry.path, tmp)
+            os.replace(tmp, entry.path)
+
+
 def update_python_pip(target: Path) -> None:
     """
     Updates pip in the provided target destination |
@@ -160,8 +305,9 @@ def update_python_pip(target: Path) -> None:
         if not pip_exists:
             raise FileNotFoundError("Error updating pip! Not found.")
 
-        command = [pip_location.as_posix(), "install", "-U", "pip"]
-        result = run(command, stderr=PIPE, text=True)
+        installer = get_python_installer()
+        with installer.timed("Updating pip"):
+            result = installer.update_pip(target)
         if result.returncode != 0 or result.stderr:
             Logger.print_error(f"{result.stderr}", False)
             Logger.print_error("Updating pip failed!")
@@ -176,27 +322,33 @@ def update_python_pip(target: Path) -> None:
         raise
 
 
-def install_python_requirements(target: Path, requirements: Path) -> None:
+def install_python_requirements(
+    target: Path, requirements: Path, force: bool = False
+) -> None:
     """
-    Installs the python packages based on a provided requirements.txt |
+    Installs the python packages based on a provided requirements.txt.
+    Skipped if the requirements and the interpreter did not change since
+    the last successful install into the virtualenv |
     :param target: Path of the virtualenv
     :param requirements: Path to the requirements.txt file
+    :param force: Install even if the requirements did not change
     :return: None
     """
     try:
         Logger.print_status("Installing Python requirements ...")
-        command = [
-            target.joinpath("bin/pip").as_posix(),
-            "install",
-            "-r",
-            f"{requirements}",
-        ]
-        result = run(command, stderr=PIPE, text=True)
-
-        if result.returncode != 0:
-            Logger.print_error(f"{result.stderr}", False)
-            raise VenvCreationFailedException("Installing Python requirements failed!")
+        key = requirements.as_posix()
+        digest = get_requirements_digest(target, requirements)
+        stamp = _read_requirements_stamp(target)
+        if not force and digest is not None and stamp.get(key) == digest:
+            Logger.print_ok("Python requirements unchanged, nothing to install!")
+            return
 
+        installer = get_python_installer()
+        with installer.timed("Installing Python requirements"):
+            _pip_install(target, ["-r", f"{requirements}"])
+        if digest is not None:
+            stamp[key] = digest
+            _write_requirements_stamp(target, stamp)
         Logger.print_ok("Installing Python requirements successful!")
 
     except Exception as e:
@@ -214,18 +366,9 @@ def install_python_packages(target: Path, packages: List[str]) -> None:
     """
     try:
         Logger.print_status("Installing Python requirements ...")
-        command = [
-            target.joinpath("bin/pip").as_posix(),
-            "install",
-        ]
-        for pkg in packages:
-            command.append(pkg)
-        result = run(command, stderr=PIPE, text=True)
-
-        if result.returncode != 0:
-            Logger.print_error(f"{result.stderr}", False)
-            raise VenvCreationFailedException("Installing Python requirements failed!")
-
+        installer = get_python_installer()
+        with installer.timed("Installing Python requirements"):
+            _pip_install(target, [*packages])
         Logger.print_ok("Installing Python requirements successful!")
 
     except Exception as e:
@@ -234,6 +377,92 @@ def install_python_packages(target: Path, packages: List[str]) -> None:
         raise VenvCreationFailedException(log)
 
 
+def get_requirements_digest(target: Path, requirements: Path) -> str | None:
+    """
+    Digest of a requirements file, the requirements and constraints files it
+    includes and the interpreter of the virtualenv |
+    :param target: Path of the virtualenv
+    :param requirements: Path to the requirements.txt file
+    :return: the SHA-256 digest or None if a file could not be read
+    """
+    include = re.compile(r"^\s*(?:-r|-c|--requirement|--constraint)[\s=]+(\S+)")
+    hasher = hashlib.sha256()
+    try:
+        # the interpreter version, virtualenv and venv use different keys
+        with open(target.joinpath("pyvenv.cfg"), "r") as f:
+            for line in sorted(f):
+                key = line.partition("=")[0].strip()
+                if key in ("home", "implementation", "version", "version_info"):
+                    hasher.update(line.strip().encode())
+
+        seen: Set[Path] = set()
+        stack: List[Path] = [requirements]
+        while stack:
+            req_file = stack.pop().resolve()
+            if req_file in seen:
+                continue
+            seen.add(req_file)
+            content = req_file.read_bytes()
+            hasher.update(req_file.as_posix().encode() + b"\0" + content + b"\0")
+            for line in content.decode(errors="replace").splitlines():
+                match = include.match(line)
+                if match:
+                    stack.append(req_file.parent.joinpath(match.group(1)))
+    except OSError:
+        return None
+    return hasher.hexdigest()
+
+
+def _read_requirements_stamp(target: Path) -> Dict[str, str]:
+    try:
+        with open(target.joinpath(REQUIREMENTS_STAMP_FILE), "r") as f:
+            stamp = json.load(f)
+        return stamp if isinstance(stamp, dict) else {}
+    except (OSError, ValueError):
+        return {}
+
+
+def _write_requirements_stamp(target: Path, stamp: Dict[str, str]) -> None:
+    # replaced instead of written in place, the file may be hardlinked
+    # into the clone of the virtualenv, see update_python_venv
+    path = target.joinpath(REQUIREMENTS_STAMP_FILE)
+    tmp = path.with_name(f"{path.name}.tmp")
+    try:
+        with open(tmp, "w") as f:
+            json.dump(stamp, f, indent=1)
+        os.replace(tmp, path)
+    except OSError as e:
+        # only costs a reinstall on the next update
+        Logger.print_warn(f"Unable to save the installed requirements: {e}")
+
+
+def _pip_install(target: Path, args: List[str]) -> None:
+    """
+    Install python packages into a virtualenv. The package index resolves
+    the versions as usual, matching wheels of the local wheelhouse are used
+    instead of building them again. Only if the index is unreachable, the
+    packages are installed from the wheelhouse alone |
+    :param target: Path of the virtualenv
+    :param args: the pip install arguments
+    :return: None
+    """
+    installer = get_python_installer()
+    wheelhouse = Wheelhouse()
+    find_links = wheelhouse.find_links(target)
+    result = installer.install(target, args, find_links=find_links)
+    if result.returncode == 0:
+        return
+
+    if find_links and not is_index_reachable():
+        Logger.print_info("Package index unreachable, using the local wheelhouse ...")
+        if wheelhouse.install(target, args, installer):
+            Logger.print_info("Installed all packages from the local wheelhouse")
+            return
+
+    Logger.print_error(f"{result.stderr}", False)
+    raise VenvCreationFailedException("Installing Python requirements failed!")
+
+
 def update_system_package_lists(silent: bool, rls_info_change=False) -> None:
     """
     Updates the systems package list |
@@ -299,23 +528,32 @@ def get_upgradable_packages() -> List[str]:
 
 def check_package_install(packages: Set[str]) -> List[str]:
     """
-    Checks the system for installed packages |
+    Checks the system for installed packages. The status of all packages
+    is queried with a single dpkg-query call |
     :param packages: List of strings of package names
     :return: A list containing the names of packages that are not installed
     """
-    not_installed = []
-    for package in packages:
-        command = ["dpkg-query", "-f'${Status}'", "--show", package]
-        result = run(
-            command,
-            stdout=PIPE,
-            stderr=DEVNULL,
-            text=True,
-        )
-        if "installed" not in result.stdout.strip("'").split():
-            not_installed.append(package)
+    if not packages:
+        return []
+
+    # dpkg-query exits with 1 if any package is unknown,
+    # the status of all known packages is printed anyway
+    command = [
+        "dpkg-query",
+        "--show",
+        "--showformat=${Package}\t${binary:Package}\t${Status}\n",
+        *sorted(packages),
+    ]
+    result = run(command, stdout=PIPE, stderr=DEVNULL, text=True)
+
+    installed: Set[str] = set()
+    for line in result.stdout.splitlines():
+        fields = line.split("\t")
+        if len(fields) != 3 or "installed" not in fields[2].split():
+            continue
+        installed.update(fields[:2])
 
-    return not_installed
+    return [p for p in packages if p not in installed]
 
 
 def install_system_packages(packages: List[str]) -> None:
@@ -374,47 +612,88 @@ def get_ipv4_addr() -> str:
         return "127.0.0.1"
 
 
-def download_file(url: str, target: Path, show_progress=True) -> None:
+def download_file(
+    url: str, target: Path, show_progress=True, sha256: str | None = None
+) -> None:
     """
-    Helper method for downloading files from a provided URL |
+    Helper method for downloading files from a provided URL.
+    Interrupted downloads are resumed and retried automatically |
     :param url: the url to the file
     :param target: the target path incl filename
     :param show_progress: show download progress or not
+    :param sha256: optional SHA-256 digest the downloaded file is verified against
     :return: None
     """
     try:
+        progress = DownloadProgress() if show_progress else None
+        http_download(url, target, sha256=sha256, progress=progress)
         if show_progress:
-            urllib.request.urlretrieve(url, target, download_progress)
             sys.stdout.write("\n")
-        else:
-            urllib.request.urlretrieve(url, target)
     except urllib.error.HTTPError as e:
         Logger.print_error(f"Download failed! HTTP error occured: {e}")
         raise
     except urllib.error.URLError as e:
         Logger.print_error(f"Download failed! URL error occured: {e}")
         raise
+    except DownloadError as e:
+        Logger.print_error(f"Download failed! {e}")
+        raise
     except Exception as e:
         Logger.print_error(f"Download failed! An error occured: {e}")
         raise
 
 
-def download_progress(block_num, block_size, total_size) -> None:
+def download_and_unzip(
+    url: str, target_dir: Path, show_progress=True, sha256: str | None = None
+) -> None:
     """
-    Reporthook method for urllib.request.urlretrieve() method call in download_file() |
-    :param block_num:
-    :param block_size:
-    :param total_size: total filesize in bytes
+    Helper method for extracting a zip-archive while it is downloaded,
+    so the archive itself is never written to disk. As the extraction cannot
+    be resumed, the target directory should be a staging directory that is
+    discarded if this fails |
+    :param url: the url to the zip-archive
+    :param target_dir: the directory to extract the archive into
+    :param show_progress: show download progress or not
+    :param sha256: optional SHA-256 digest the archive is verified against
     :return: None
     """
-    downloaded = block_num * block_size
-    percent = 100 if downloaded >= total_size else downloaded / total_size * 100
-    mb = 1024 * 1024
-    progress = int(percent / 5)
-    remaining = "-" * (20 - progress)
-    dl = f"\rDownloading: [{'#' * progress}{remaining}]{percent:.2f}% ({downloaded / mb:.2f}/{total_size / mb:.2f}MB)"
-    sys.stdout.write(dl)
-    sys.stdout.flush()
+    progress = DownloadProgress() if show_progress else None
+    with http_open(url) as response:
+        stream = HttpStream(response, progress)
+        unzip_stream(stream, target_dir)
+    if show_progress:
+        sys.stdout.write("\n")
+
+    if sha256 is not None and stream.hexdigest() != sha256.lower():
+        raise DownloadError(
+            f"Checksum mismatch: expected {sha256.lower()}, got {stream.hexdigest()}"
+        )
+
+
+class DownloadProgress:
+    """
+    Progress hook for the download_file() method.
+    Only redraws the progress bar if the displayed value changed.
+    """
+
+    def __init__(self) -> None:
+        self._last: str = ""
+
+    def __call__(self, downloaded: int, total_size: int) -> None:
+        mb = 1024 * 1024
+        if total_size <= 0:
+            dl = f"\rDownloading: {downloaded / mb:.2f}MB"
+        else:
+            percent = min(downloaded / total_size * 100, 100)
+            progress = int(percent / 5)
+            remaining = "-" * (20 - progress)
+            dl = f"\rDownloading: [{'#' * progress}{remaining}]{percent:.2f}% ({downloaded / mb:.2f}/{total_size / mb:.2f}MB)"
+
+        if dl == self._last:
+            return
+        self._last = dl
+        sys.stdout.write(dl)
+        sys.stdout.flush()
 
 
 def set_nginx_permissions() -> None:
@@ -452,6 +731,79 @@ def cmd_sysctl_service(name: str, action: SysCtlServiceAction) -> None:
         raise
 
 
+def cmd_sysctl_services(
+    names: List[str], action: SysCtlServiceAction
+) -> SysCtlBatchResult:
+    """
+    Execute an action for several systemd services with a single systemctl call.
+    Systemd queues the jobs of all units at once and runs them in parallel, so
+    the call takes about as long as the slowest unit. If the call fails, the
+    state of every unit is queried to report which of them failed. |
+    :param names: the service names
+    :param action: Either "start", "stop", "restart" or "disable"
+    :return: the result for each unit
+    :raises SysCtlBatchError: if the action failed for at least one unit
+    """
+    result = SysCtlBatchResult(action)
+    if not names:
+        return result
+
+    cmd = ["sudo", "systemctl", action, *names]
+    Logger.print_status(f"{action.capitalize()} {', '.join(names)} ...")
+    try:
+        run(cmd, stderr=PIPE, check=True)
+        result.succeeded.extend(names)
+        Logger.print_ok("OK!")
+        return result
+    except CalledProcessError as e:
+        query, success_states = SYSCTL_ACTION_STATES[action]
+        for name, state in zip(names, get_unit_states(names, query)):
+            if state in success_states:
+                result.succeeded.append(name)
+            else:
+                result.failed[name] = state
+                Logger.print_error(f"Failed to {action} {name} (state: {state})")
+        Logger.print_error(e.stderr.decode().strip())
+        raise SysCtlBatchError(result, e)
+
+
+def get_unit_states(
+    names: List[str], query: Literal["is-active", "is-enabled"]
+) -> List[str]:
+    """
+    Query the state of several systemd units with a single systemctl call |
+    :param names: the unit names
+    :param query: Either "is-active" or "is-enabled"
+    :return: the state of each unit in the order of the names
+    """
+    # 'systemctl is-active/is-enabled' prints no line for units it can not
+    # resolve, so the lines can not be matched to the names. 'show' prints a
+    # block of properties per unit, which is matched by the names of the unit
+    props = "Id,Names,LoadState,ActiveState,UnitFileState"
+    cmd = ["systemctl", "show", f"--property={props}", *names]
+    res = run(cmd, stdout=PIPE, stderr=DEVNULL, text=True)
+
+    units: Dict[str, Dict[str, str]] = {}
+    for block in res.stdout.split("\n\n"):
+        unit = dict(line.partition("=")[::2] for line in block.splitlines() if line)
+        for name in [unit.get("Id", ""), *unit.get("Names", "").split()]:
+            if name:
+                units[name] = unit
+
+    states: List[str] = []
+    for name in names:
+        unit = units.get(name) or units.get(f"{name}.service")
+        if unit is None:
+            states.append("unknown")
+        elif unit.get("LoadState") == "not-found":
+            states.append("not-found" if query == "is-enabled" else "inactive")
+        elif query == "is-active":
+            states.append(unit.get("ActiveState") or "unknown")
+        else:
+            states.append(unit.get("UnitFileState") or "unknown")
+    return states
+
+
 def cmd_sysctl_manage(action: SysCtlManageAction) -> None:
     try:
         run(["sudo", "systemctl", action], stderr=PIPE, check=True)
@@ -472,6 +824,10 @@ def unit_file_exists(
     :return: True if the unit file exists, False otherwise
     """
     exclude = exclude or []
+    if suffix == "service":
+        units = InstanceRegistry().get_service_units(name)
+        return any(not any(s in unit for s in exclude) for unit, _ in units)
+
     pattern = re.compile(f"^{name}(-[0-9a-zA-Z]+)?.{suffix}$")
     service_list = [
         Path(SYSTEMD, service)
@@ -517,6 +873,7 @@ def create_service_file(name: str, content: str) -> None:
             stdout=DEVNULL,
             check=True,
         )
+        InstanceRegistry().invalidate()
         Logger.print_ok(f"Service file created: {SYSTEMD.joinpath(name)}")
     except CalledProcessError as e:
         Logger.print_error(f"Error creating service file: {e}")
@@ -558,6 +915,7 @@ def remove_system_service(service_name: str) -> None:
         cmd_sysctl_service(service_name, "stop")
         cmd_sysctl_service(service_name, "disable")
         remove_with_sudo(file)
+        InstanceRegistry().invalidate()
         cmd_sysctl_manage("daemon-reload")
         cmd_sysctl_manage("reset-failed")
         Logger.print_ok(f"{service_name} successfully removed!")